@@ -0,0 +1,17 @@
+#_synthetic.py
+# Synthetic alphabets shared by the benchmark scripts (imported as
+# `from _synthetic import ...`, since each script runs with benchmarks/ on
+# sys.path). Encoding and decoding never inspect the glyphs, so private-use
+# code points stand in for emojis and no scraped emoji data is needed.
+
+def synthetic_emojis(count):
+    """`count` distinct single-code-point stand-ins for emojis, in order."""
+    return [chr(0xF0000 + i) for i in range(count)]
+
+def synthetic_map(count):
+    """An emoji_map {"0": emoji, ...} of `count` synthetic emojis."""
+    return {str(i): e for i, e in enumerate(synthetic_emojis(count))}
+
+def synthetic_config(count):
+    """A config shaped like one cache entry, for dbaser and friends."""
+    return {"emoji_count": count, "emoji_map": synthetic_map(count)}
@@ -0,0 +1,142 @@
+#bench_alloc.py
+# How to Run:
+#    python benchmarks/bench_alloc.py [calls]
+# Compares the allocations and wall time of the baseline encoder (str-keyed
+# emoji_map / reverse_emoji_map, a per-digit divmod loop, regex \X grapheme
+# splitting on decode), kept verbatim below, against the current
+# array-backed _HybridBaseEncoder, plus what each encoder holds beyond the
+# config's emoji_map (the current one adds a trie and digit tables). Per
+# call it reports:
+#   peak B      mean of the largest traced working set during one call
+#               (temporaries plus the result)
+#   kept blocks, kept B
+#               tracemalloc snapshot diff over all calls with every result
+#               kept alive, divided by the number of calls
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+import regex
+
+from doublebase_coder.encoder import _HybridBaseEncoder
+from _synthetic import synthetic_map
+
+BASES = [256, 1024, 4096]
+
+class BaselineEncoder:
+    """The encode/decode path before the array-backed alphabet, kept verbatim."""
+    def __init__(self, emoji_map: Dict[str, str]):
+        self.emoji_map = emoji_map
+        self.reverse_emoji_map = {v: k for k, v in emoji_map.items()}
+        self.emoji_count = len(self.emoji_map)
+        if self.emoji_count == 0: raise ValueError("Emoji map cannot be empty.")
+        self.decimal_base = 10
+        self.input_bits = 128
+        self.max_input_value = 2**self.input_bits - 1
+        self.N = self._find_minimum_N()
+        self.half_N = self.N // 2
+    def _find_minimum_N(self) -> int:
+        N = 2
+        while True:
+            half = N // 2
+            if half == 0: N += 2; continue
+            capacity = (self.decimal_base ** half) * (self.emoji_count ** half)
+            if capacity >= 2**self.input_bits: return N
+            N += 2
+    def _encode_to_indices(self, checksum_int: int) -> Tuple[List[int], List[int]]:
+        if checksum_int > self.max_input_value: raise ValueError(f"Input {checksum_int} exceeds 128-bit range")
+        decs, emos = [], []
+        temp_val = checksum_int
+        for _ in range(self.half_N):
+            emos.insert(0, temp_val % self.emoji_count)
+            temp_val //= self.emoji_count
+        for _ in range(self.half_N):
+            decs.insert(0, temp_val % self.decimal_base)
+            temp_val //= self.decimal_base
+        return decs, emos
+    def _decode_from_indices(self, decimal_digits: List[int], emoji_indices: List[int]) -> int:
+        val = 0
+        for digit in decimal_digits: val = val * self.decimal_base + digit
+        for index in emoji_indices: val = val * self.emoji_count + index
+        return val
+    def encode(self, data_bytes: bytes) -> Tuple[str, str]:
+        checksum_int = int.from_bytes(data_bytes, 'big')
+        decimal_digits, emoji_indices = self._encode_to_indices(checksum_int)
+        decimal_str = "".join(map(str, decimal_digits)).zfill(self.half_N)
+        emoji_str = "".join([self.emoji_map[str(i)] for i in emoji_indices])
+        return decimal_str, emoji_str
+    def decode(self, decimal_str: str, emoji_str: str) -> bytes:
+        decimal_digits = [int(d) for d in decimal_str]
+        graphemes = regex.findall(r'\X', emoji_str)
+        emoji_indices = [int(self.reverse_emoji_map[emo]) for emo in graphemes]
+        checksum_int = self._decode_from_indices(decimal_digits, emoji_indices)
+        return checksum_int.to_bytes(16, 'big', signed=False)
+
+def per_call_peak(fn, args_list):
+    tracemalloc.start()
+    total = 0
+    for args in args_list:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = fn(*args)
+        total += tracemalloc.get_traced_memory()[1] - before
+        del result
+    tracemalloc.stop()
+    return total / len(args_list)
+
+def kept_per_call(fn, args_list):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [fn(*args) for args in args_list]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = after.compare_to(before, 'filename')
+    del results
+    return (sum(stat.count_diff for stat in diff) / len(args_list),
+            sum(stat.size_diff for stat in diff) / len(args_list))
+
+def us_per_call(fn, args_list):
+    start = time.perf_counter()
+    for args in args_list: fn(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+def traced_size(build):
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    records = [os.urandom(16) for _ in range(calls)]
+    print(f"{'base':>5} {'baseline encoder B':>19} {'array encoder B':>16}")
+    for base in BASES:
+        emoji_map = synthetic_map(base)
+        print(f"{base:>5} {traced_size(lambda: BaselineEncoder(emoji_map)):>19} "
+              f"{traced_size(lambda: _HybridBaseEncoder(emoji_map)):>16}")
+    print()
+    print(f"{'base':>5} {'op':<7} {'impl':<9} {'peak B':>8} {'kept blocks':>12} {'kept B':>8} {'us/call':>8}")
+    for base in BASES:
+        emoji_map = synthetic_map(base)
+        baseline, encoder = BaselineEncoder(emoji_map), _HybridBaseEncoder(emoji_map)
+        pairs = [encoder.encode(r) for r in records]
+        for r, (dec, emo) in zip(records, pairs):
+            assert baseline.encode(r) == (dec, emo)
+            assert baseline.decode(dec, emo) == encoder.decode(dec, emo) == r
+        rows = [
+            ("encode", "baseline", baseline.encode, [(r,) for r in records]),
+            ("encode", "array", encoder.encode, [(r,) for r in records]),
+            ("decode", "baseline", baseline.decode, pairs),
+            ("decode", "array", encoder.decode, pairs),
+        ]
+        for op, impl, fn, args_list in rows:
+            peak = per_call_peak(fn, args_list)
+            blocks, kept = kept_per_call(fn, args_list)
+            print(f"{base:>5} {op:<7} {impl:<9} {peak:>8.0f} {blocks:>12.2f} {kept:>8.0f} {us_per_call(fn, args_list):>8.2f}")
+
+if __name__ == "__main__":
+    main()
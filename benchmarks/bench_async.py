@@ -0,0 +1,62 @@
+#bench_async.py
+# How to Run:
+#    python benchmarks/bench_async.py [calls] [concurrency]
+# Simulates an async service encoding checksums: `concurrency` request
+# handlers share `calls` encodes, while a ticker task measures how long the
+# event loop is stalled. Compares plain dbase_encode on the loop against
+# AsyncDbaser inline and with a thread executor.
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from doublebase_coder import AsyncDbaser, dbaser
+from _synthetic import synthetic_config
+
+async def ticker(stop, lags, interval=0.001):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+async def run_scenario(encode, records, concurrency):
+    async def handler(chunk):
+        for record in chunk:
+            await encode(record)
+    stop, lags = asyncio.Event(), []
+    tick = asyncio.ensure_future(ticker(stop, lags))
+    step = -(-len(records) // concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*[handler(records[i:i + step]) for i in range(0, len(records), step)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return len(records) / elapsed, max(lags, default=0.0) * 1000
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    config = synthetic_config(1024)
+    records = [os.urandom(16) for _ in range(calls)]
+    encode, _ = dbaser(config)
+
+    async def plain(record):
+        return encode(record)
+
+    async def scenarios():
+        rows = [("dbase_encode on loop", plain)]
+        rows.append(("AsyncDbaser inline", AsyncDbaser(config).encode))
+        executor = ThreadPoolExecutor(max_workers=2)
+        rows.append(("AsyncDbaser thread", AsyncDbaser(config, executor=executor).encode))
+        print(f"{calls} calls, {concurrency} concurrent handlers, base 1024")
+        print(f"{'scenario':<22} {'calls/s':>10} {'max loop stall ms':>18}")
+        for name, fn in rows:
+            rate, stall = await run_scenario(fn, records, concurrency)
+            print(f"{name:<22} {rate:>10,.0f} {stall:>18.2f}")
+        executor.shutdown()
+
+    asyncio.run(scenarios())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#bench_herd.py
+# How to Run:
+#    python benchmarks/bench_herd.py [processes] [fetch_delay_s]
+# Starts `processes` workers at once, all running cold_setup against the same
+# empty cache file with a provider that takes `fetch_delay_s` per fetch, and
+# reports how many fetches happened, wall time, and whether every worker got
+# a usable config.
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from doublebase_coder import AlphabetProvider, cold_setup, dbaser
+from _synthetic import synthetic_map
+
+BASES = [256, 1024]
+
+class CountingProvider(AlphabetProvider):
+    """Synthetic provider that records each fetch in a log file."""
+    def __init__(self, log_path, delay):
+        super().__init__()
+        self.log_path, self.delay = log_path, delay
+
+    async def fetch_maps(self, bases):
+        with open(self.log_path, 'a') as f:
+            f.write(f"{os.getpid()}\n")
+        await asyncio.sleep(self.delay)
+        return {base: synthetic_map(base) for base in bases}
+
+def worker(args):
+    cache_path, log_path, delay = args
+    sys.stdout = open(os.devnull, 'w')
+    configs = asyncio.run(cold_setup(BASES, cache_path, provider=CountingProvider(log_path, delay)))
+    encode, decode = dbaser(configs[str(BASES[-1])])
+    record = os.urandom(16)
+    return decode(*encode(record)) == record
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "dbase_cache.json")
+        log_path = os.path.join(tmp, "fetches.log")
+        with multiprocessing.Pool(processes) as pool:
+            start = time.perf_counter()
+            results = pool.map(worker, [(cache_path, log_path, delay)] * processes)
+            elapsed = time.perf_counter() - start
+        with open(log_path) as f:
+            fetches = len(f.read().split())
+    print(f"{processes} processes, {delay}s per fetch: {fetches} fetch(es), "
+          f"{elapsed:.2f}s wall, {sum(results)}/{processes} workers OK")
+
+if __name__ == "__main__":
+    main()
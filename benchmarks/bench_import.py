@@ -0,0 +1,54 @@
+#bench_import.py
+# How to Run:
+#    python benchmarks/bench_import.py [budget_ms]
+# Imports doublebase_coder and dbaser in a fresh interpreter under
+# `python -X importtime`, reports the cumulative import cost, and exits
+# non-zero if a heavy dependency leaks into that path, if the import prints
+# anything, or if it goes over budget (default 50 ms).
+import re
+import subprocess
+import sys
+
+IMPORT_SNIPPET = "import doublebase_coder; from doublebase_coder import dbaser, warm_setup"
+
+# Modules that must stay off the `import doublebase_coder` / dbaser path.
+FORBIDDEN = ["httpx", "regex", "asyncio", "subprocess", "flask", "numpy", "requests"]
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure():
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET],
+                            capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            # Keep the outermost (least indented) entry for each module.
+            name, cumulative, depth = match.group(4), int(match.group(2)), len(match.group(3))
+            if name not in modules or depth < modules[name][1]:
+                modules[name] = (cumulative, depth)
+    return modules, result.stdout
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 50.0
+    modules, stdout = measure()
+    total_ms = modules.get("doublebase_coder", (0, 0))[0] / 1000
+    ours = sorted((name, us / 1000) for name, (us, _) in modules.items() if name.startswith("doublebase_coder"))
+    print(f"import doublebase_coder: {total_ms:.2f} ms cumulative (budget {budget_ms:.0f} ms)")
+    for name, ms in ours:
+        print(f"  {name:<32} {ms:>8.2f} ms")
+
+    problems = []
+    leaked = [name for name in FORBIDDEN if name in modules]
+    if leaked:
+        problems.append(f"heavy modules imported eagerly: {', '.join(leaked)}")
+    if stdout:
+        problems.append(f"import wrote to stdout: {stdout.strip()!r}")
+    if total_ms > budget_ms:
+        problems.append(f"import took {total_ms:.2f} ms, over the {budget_ms:.0f} ms budget")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#bench_memo.py
+# How to Run:
+#    python benchmarks/bench_memo.py [calls] [distinct_records] [memo_size]
+# Replays a skewed (Zipf-like) stream of encode and decode calls, where a
+# few popular checksums dominate, through a plain dbaser pair and through
+# one with memo_size set, and reports ns/call and the memo's hit rates.
+import os
+import random
+import sys
+import time
+
+from doublebase_coder import dbaser
+from _synthetic import synthetic_config
+
+def skewed_indices(calls, distinct, rng):
+    weights = [1.0 / (rank + 1) for rank in range(distinct)]
+    return rng.choices(range(distinct), weights=weights, k=calls)
+
+def replay(encode, decode, records, pairs, stream):
+    start = time.perf_counter()
+    for i, index in enumerate(stream):
+        if i & 1:
+            decode(*pairs[index])
+        else:
+            encode(records[index])
+    return (time.perf_counter() - start) / len(stream) * 1e9
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    memo_size = int(sys.argv[3]) if len(sys.argv) > 3 else 4096
+    rng = random.Random(0)
+    config = synthetic_config(1024)
+    encode, decode = dbaser(config)
+    records = [os.urandom(16) for _ in range(distinct)]
+    pairs = [encode(record) for record in records]
+    stream = skewed_indices(calls, distinct, rng)
+
+    print(f"{calls} calls over {distinct} distinct checksums (Zipf), half encode / half decode, base 1024")
+    plain = replay(encode, decode, records, pairs, stream)
+    print(f"{'plain dbaser':<22} {plain:>8.0f} ns/call")
+    memo_encode, memo_decode = dbaser(config, memo_size=memo_size)
+    memoized = replay(memo_encode, memo_decode, records, pairs, stream)
+    info = memo_encode.memo.info()
+    rates = {d: info[d]["hits"] / max(1, info[d]["hits"] + info[d]["misses"]) for d in ("encode", "decode")}
+    print(f"{f'memo_size={memo_size}':<22} {memoized:>8.0f} ns/call  "
+          f"(hit rate encode {rates['encode']:.0%}, decode {rates['decode']:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#bench_metrics.py
+# How to Run:
+#    python benchmarks/bench_metrics.py [calls]
+# Measures what metrics cost on the encode/decode hot path: per-call time of
+# dbase_encode / dbase_decode with metrics disabled (the default) and
+# enabled, per base.
+import os
+import sys
+import time
+
+from doublebase_coder import dbaser, metrics
+from _synthetic import synthetic_config
+
+BASES = [256, 1024, 4096]
+
+def per_call_ns(fn, args_list):
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e9
+
+def measure(config, records):
+    encode, decode = dbaser(config)
+    pairs = [encode(record) for record in records]
+    return per_call_ns(encode, [(record,) for record in records]), per_call_ns(decode, pairs)
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    records = [os.urandom(16) for _ in range(calls)]
+    print(f"{calls} calls per cell, ns/call")
+    print(f"{'base':>6} {'encode off':>11} {'encode on':>10} {'decode off':>11} {'decode on':>10}")
+    for base in BASES:
+        config = synthetic_config(base)
+        metrics.disable()
+        encode_off, decode_off = measure(config, records)
+        metrics.enable()
+        encode_on, decode_on = measure(config, records)
+        print(f"{base:>6} {encode_off:>11.0f} {encode_on:>10.0f} {decode_off:>11.0f} {decode_on:>10.0f}")
+    metrics.disable()
+
+if __name__ == "__main__":
+    main()
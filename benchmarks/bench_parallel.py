@@ -0,0 +1,35 @@
+#bench_parallel.py
+# How to Run:
+#    python benchmarks/bench_parallel.py [records] [max_workers]
+# Encodes a temporary file of random 16-byte records with encode_file_parallel
+# using 1..max_workers processes and reports throughput and speedup vs 1 worker.
+import os
+import sys
+import tempfile
+import time
+
+from doublebase_coder.parallel import encode_file_parallel
+from _synthetic import synthetic_config
+
+def main():
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    config = synthetic_config(1024)
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "records.bin")
+        output_path = os.path.join(tmp, "records.txt")
+        with open(input_path, 'wb') as f:
+            f.write(os.urandom(16 * records))
+
+        print(f"{records} records, base 1024, {os.cpu_count()} CPUs")
+        print(f"{'workers':>7} {'seconds':>8} {'records/s':>12} {'speedup':>8}")
+        baseline = None
+        for workers in range(1, max_workers + 1):
+            start = time.perf_counter()
+            encode_file_parallel(config, input_path, output_path, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>7} {elapsed:>8.2f} {records / elapsed:>12,.0f} {baseline / elapsed:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#bench_radix.py
+# How to Run:
+#    python benchmarks/bench_radix.py [iterations]
+# Compares _HybridBaseEncoder.encode, which extracts emoji digits with chunked
+# radix tables, against the original one-digit-at-a-time divmod loop, for
+# emoji bases 16 through 4096.
+import os
+import sys
+import timeit
+
+from doublebase_coder.doublebase_lib import _HybridBaseEncoder
+from _synthetic import synthetic_map
+
+BASES = [16, 64, 256, 1024, 4096]
+
+def legacy_encode_to_indices(encoder, checksum_int):
+    """The original per-digit loop, kept verbatim as the baseline."""
+    decs, emos = [], []
+    temp_val = checksum_int
+    for _ in range(encoder.half_N):
+        emos.insert(0, temp_val % encoder.emoji_count)
+        temp_val //= encoder.emoji_count
+    for _ in range(encoder.half_N):
+        decs.insert(0, temp_val % encoder.decimal_base)
+        temp_val //= encoder.decimal_base
+    return decs, emos
+
+def legacy_encode(encoder, emoji_map, data_bytes):
+    decimal_digits, emoji_indices = legacy_encode_to_indices(encoder, int.from_bytes(data_bytes, 'big'))
+    decimal_str = "".join(map(str, decimal_digits)).zfill(encoder.half_N)
+    emoji_str = "".join([emoji_map[str(i)] for i in emoji_indices])
+    return decimal_str, emoji_str
+
+def per_call_us(fn, items, iterations):
+    rounds = max(1, iterations // len(items))
+    return timeit.timeit(lambda: [fn(x) for x in items], number=rounds) * 1e6 / (rounds * len(items))
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    checksums = [os.urandom(16) for _ in range(256)]
+    print(f"{'base':>6} {'half_N':>6} | {'encode: legacy us':>17} {'chunked us':>10} {'speedup':>7}")
+    for base in BASES:
+        emoji_map = synthetic_map(base)
+        encoder = _HybridBaseEncoder(emoji_map)
+        for c in checksums:
+            assert encoder.encode(c) == legacy_encode(encoder, emoji_map, c)
+        old_enc = per_call_us(lambda c: legacy_encode(encoder, emoji_map, c), checksums, iterations)
+        new_enc = per_call_us(encoder.encode, checksums, iterations)
+        print(f"{base:>6} {encoder.half_N:>6} | {old_enc:>17.2f} {new_enc:>10.2f} {old_enc / new_enc:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
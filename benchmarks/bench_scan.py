@@ -0,0 +1,71 @@
+#bench_scan.py
+# How to Run:
+#    python benchmarks/bench_scan.py [megabytes] [token_every_n_lines]
+# Writes a synthetic log with a '<decimal> | <emoji>' token every few lines,
+# then compares TokenScanner.scan_file against the hand-rolled approach
+# (read the file, regex every line, dbase_decode each token), reporting
+# throughput and peak traced memory.
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from doublebase_coder import TokenScanner, dbaser
+from _synthetic import synthetic_config
+
+def write_log(path, megabytes, every, encode):
+    rng = random.Random(0)
+    with open(path, 'w', encoding='utf-8') as f:
+        written, line = 0, 0
+        while written < megabytes * 1_000_000:
+            if line % every == 0:
+                decimal_str, emoji_str = encode(rng.getrandbits(128).to_bytes(16, "big"))
+                text = f"2024-01-01 INFO stored object checksum={decimal_str} | {emoji_str} size={rng.randrange(1 << 20)}\n"
+            else:
+                text = f"2024-01-01 DEBUG request {line} served in {rng.randrange(1000)} ms from 10.0.0.{rng.randrange(256)}\n"
+            f.write(text)
+            written += len(text.encode('utf-8'))
+            line += 1
+
+def hand_rolled(path, decode, half_N):
+    pattern = re.compile(r"(?<![0-9])([0-9]{%d}) \| (\S+)" % half_N)
+    found = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f.read().splitlines():
+            for match in pattern.finditer(line):
+                decode(match.group(1), match.group(2))
+                found += 1
+    return found
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    found = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return found, elapsed, peak
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    every = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    config = synthetic_config(1024)
+    encode, decode = dbaser(config)
+    scanner = TokenScanner(config)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "app.log")
+        write_log(path, megabytes, every, encode)
+        size = os.path.getsize(path) / 1e6
+        print(f"{size:.0f} MB log, a token every {every} lines")
+        print(f"{'approach':<24} {'tokens':>9} {'MB/s':>8} {'peak MB':>9}")
+        rows = [("read + regex + decode", lambda: hand_rolled(path, decode, scanner.encoder.half_N)),
+                ("TokenScanner.scan_file", lambda: sum(1 for _ in scanner.scan_file(path)))]
+        for name, fn in rows:
+            found, elapsed, peak = measure(fn)
+            print(f"{name:<24} {found:>9} {size / elapsed:>8.1f} {peak / 1e6:>9.1f}")
+
+if __name__ == "__main__":
+    main()
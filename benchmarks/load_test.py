@@ -0,0 +1,67 @@
+#load_test.py
+# How to Run:
+#    Start a server, e.g. `db-api-server --production --workers 4 --port 8765`, then:
+#    python benchmarks/load_test.py http://127.0.0.1:8765/api/v1/ordered-set --requests 5000 --concurrency 200
+# Fires concurrent POSTs at the ordered-set endpoint (mimicking a fleet of
+# workers cold-starting at once) and reports p50/p99 latency and requests/sec.
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+BASES = [256, 512, 1024, 2048]
+
+async def _worker(url, queue, latencies, errors):
+    # One client (and keep-alive connection) per simulated worker, like a real fleet.
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            payload = {"ordered_set_count": BASES[i % len(BASES)], "sets": ["core", "extended"]}
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json=payload)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            except httpx.HTTPError:
+                errors.append(i)
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def run_load_test(url, total_requests, concurrency):
+    queue = asyncio.Queue()
+    for i in range(total_requests): queue.put_nowait(i)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[_worker(url, queue, latencies, errors) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "url": url,
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the DoubleBase ordered-set API.")
+    parser.add_argument("url", help="Full endpoint URL, e.g. http://127.0.0.1:8765/api/v1/ordered-set")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run_load_test(args.url, args.requests, args.concurrency)), indent=2))
+
+if __name__ == "__main__":
+    main()
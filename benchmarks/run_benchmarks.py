@@ -0,0 +1,241 @@
+#run_benchmarks.py
+# How to Run:
+#    python benchmarks/run_benchmarks.py [--quick] [--only encode,decode,warm,cold,api] [--output results.json]
+# Runs the regression benchmark suite and prints (or writes) one JSON document:
+#    encode / decode  - dbaser single-record and batch throughput per base (16 .. 4096)
+#    warm             - warm_setup latency vs number of bases in the cache, per cache layout
+#    cold             - cold_setup latency against an in-process stub ordered-set server
+#                       (HttpProvider) and with the InProcessProvider
+#    api              - /api/v1/ordered-set request latency via Flask's test client
+# Alphabets are synthetic (private-use code points), so no scraped emoji data
+# or running server is needed. Compare two result files to spot regressions.
+import argparse
+import asyncio
+import contextlib
+import datetime
+import io
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from doublebase_coder import dbaser, warm_setup
+from doublebase_coder.binary_cache import write_binary_cache
+from doublebase_coder.encoder import _get_numpy, clear_encoder_cache, config_alphabet
+from doublebase_coder.prefix_cache import write_prefix_cache
+from _synthetic import synthetic_config, synthetic_emojis
+
+BASES = [16, 64, 256, 1024, 4096]
+CACHE_SIZES = [1, 4, 16, 64]
+SUITES = ["encode", "decode", "warm", "cold", "api"]
+
+def synthetic_emoji_data(count=max(BASES)):
+    # Two overlapping sets, shaped like emoji_data.json.
+    emojis = synthetic_emojis(count)
+    return {"core": emojis[:count // 2], "extended": emojis[count // 4:]}
+
+def timed(fn, number, repeat):
+    """Runs fn() `number` times per round for `repeat` rounds; returns per-call seconds for each round."""
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number): fn()
+        rounds.append((time.perf_counter() - start) / number)
+    return rounds
+
+def summarize(rounds, items_per_call=1):
+    best = min(rounds)
+    return {
+        "us_per_call_min": round(best * 1e6, 3),
+        "us_per_call_median": round(statistics.median(rounds) * 1e6, 3),
+        "items_per_s": round(items_per_call / best, 1),
+    }
+
+@contextlib.contextmanager
+def quiet():
+    # warm_setup / cold_setup report progress on stdout; keep the JSON output clean.
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+# --- encode / decode ---
+
+def bench_codec(args, direction):
+    results = []
+    batch_records = 1024 if args.quick else 8192
+    for base in BASES:
+        config = synthetic_config(base)
+        encode, decode = dbaser(config)
+        encode_many, decode_many = dbaser(config, batch=True)
+        records = [os.urandom(16) for _ in range(batch_records)]
+        pairs = encode_many(b"".join(records))
+        record_iter = itertools.cycle(records)
+        if direction == "encode":
+            single = timed(lambda: encode(next(record_iter)), args.number, args.repeat)
+            buf = b"".join(records)
+            batch = timed(lambda: encode_many(buf), 1, args.repeat)
+        else:
+            pair_iter = itertools.cycle(pairs)
+            single = timed(lambda: decode(*next(pair_iter)), args.number, args.repeat)
+            batch = timed(lambda: decode_many(pairs), 1, args.repeat)
+        results.append({"suite": direction, "mode": "single", "base": base, **summarize(single)})
+        results.append({"suite": direction, "mode": "batch", "base": base, "records_per_call": batch_records,
+                        **summarize(batch, batch_records)})
+    return results
+
+# --- warm_setup ---
+
+def bench_warm(args, tmp):
+    results = []
+    for size in CACHE_SIZES:
+        configs = {str(16 * (i + 1)): synthetic_config(16 * (i + 1)) for i in range(size)}
+        json_path = os.path.join(tmp, f"cache_{size}.json")
+        binary_path = os.path.join(tmp, f"cache_{size}.dbc")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(configs, f, ensure_ascii=False, indent=2)
+        write_binary_cache(configs, binary_path)
+        prefix_path = os.path.join(tmp, f"cache_{size}.prefix.json")
+        write_prefix_cache(configs, prefix_path)
+        # Load the cache and fetch one base's alphabet, as dbaser would.
+        key = str(16 * size)
+        for fmt, path in (("json", json_path), ("prefix", prefix_path), ("binary", binary_path)):
+            def load():
+                cache = warm_setup(path)
+                config_alphabet(cache[key])
+                if hasattr(cache, "close"): cache.close()
+            with quiet():
+                rounds = timed(load, max(1, args.number // 100), args.repeat)
+            results.append({"suite": "warm", "format": fmt, "bases_in_cache": size,
+                            "file_bytes": os.path.getsize(path), **summarize(rounds)})
+    return results
+
+# --- cold_setup ---
+
+class _StubOrderedSetHandler(BaseHTTPRequestHandler):
+    """Answers POST /api/v1/ordered-set(s) like the real server, from synthetic data."""
+    ordered = synthetic_emojis(max(BASES))
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        if self.path == "/api/v1/ordered-set":
+            reply = {str(i): e for i, e in enumerate(self.ordered[:payload["ordered_set_count"]])}
+        elif self.path == "/api/v1/ordered-sets":
+            cuts = {str(c): min(c, len(self.ordered)) for c in payload["counts"]}
+            reply = {"cuts": cuts, "emojis": self.ordered[:max(cuts.values())]}
+        else:
+            self.send_error(404)
+            return
+        body = json.dumps(reply).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@contextlib.contextmanager
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOrderedSetHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/api/v1/ordered-set"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def bench_cold(args, tmp):
+    from doublebase_coder import cold_setup, HttpProvider, InProcessProvider
+    data_path = os.path.join(tmp, "emoji_data.json")
+    with open(data_path, 'w', encoding='utf-8') as f:
+        json.dump(synthetic_emoji_data(), f, ensure_ascii=False)
+    bases = [256, 1024]
+    counter = itertools.count()
+
+    def run(provider_factory):
+        # A fresh cache path every call, so every call really fetches.
+        cache_path = os.path.join(tmp, f"cold_{next(counter)}.json")
+        result = asyncio.run(cold_setup(bases, cache_path, provider=provider_factory()))
+        if not result: raise RuntimeError("cold_setup failed during benchmark")
+        os.remove(cache_path)
+
+    results = []
+    number = max(1, args.number // 500)
+    with stub_server() as url, quiet():
+        http_rounds = timed(lambda: run(lambda: HttpProvider(api_url=url)), number, args.repeat)
+        local_rounds = timed(lambda: run(lambda: InProcessProvider(emoji_data_path=data_path)), number, args.repeat)
+    results.append({"suite": "cold", "provider": "http-stub", "bases": bases, **summarize(http_rounds)})
+    results.append({"suite": "cold", "provider": "in-process", "bases": bases, **summarize(local_rounds)})
+    return results
+
+# --- API ---
+
+def bench_api(args):
+    from doublebase_coder import api
+    api.emoji_data = synthetic_emoji_data()
+    api._ordered_set_index.clear()
+    client = api.app.test_client()
+    results = []
+    for base in BASES:
+        payload = {"ordered_set_count": base, "sets": ["core", "extended"]}
+        def request():
+            response = client.post("/api/v1/ordered-set", json=payload)
+            if response.status_code != 200: raise RuntimeError(response.get_data(as_text=True))
+        request()
+        rounds = timed(request, max(1, args.number // 20), args.repeat)
+        results.append({"suite": "api", "endpoint": "/api/v1/ordered-set", "base": base, **summarize(rounds)})
+    return results
+
+def metadata():
+    try:
+        from importlib.metadata import version
+        package_version = version("doublebase-coder")
+    except Exception:
+        package_version = None
+    return {
+        "package_version": package_version,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": _get_numpy() is not None,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DoubleBase benchmark suite (JSON output).")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for smoke runs.")
+    parser.add_argument("--only", default=",".join(SUITES), help=f"Comma-separated suites from: {', '.join(SUITES)}.")
+    parser.add_argument("--output", help="Write the JSON here instead of stdout.")
+    args = parser.parse_args(argv)
+    args.number, args.repeat = (2000, 3) if args.quick else (20000, 5)
+    suites = [s.strip() for s in args.only.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown: parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for suite in suites:
+            clear_encoder_cache()
+            if suite in ("encode", "decode"): results.extend(bench_codec(args, suite))
+            elif suite == "warm": results.extend(bench_warm(args, tmp))
+            elif suite == "cold": results.extend(bench_cold(args, tmp))
+            elif suite == "api": results.extend(bench_api(args))
+            print(f"  {suite}: done", file=sys.stderr)
+
+    document = json.dumps({"meta": metadata(), "results": results}, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+
+if __name__ == "__main__":
+    main()
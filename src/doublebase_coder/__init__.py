@@ -1,6 +1,25 @@
 # src/doublebase_coder/__init__.py
 
-# Expose the public functions from the library module
-from .doublebase_lib import cold_setup, warm_setup, dbaser
+# Expose the public functions from the library module.
+# warm_setup and dbaser only need the pure-math encoder; cold_setup and the
+# alphabet providers (asyncio, subprocess, httpx), the asyncio facade and the
+# token scanner are imported on first access.
+import importlib
 
-print("DoubleBase Coder Library Initialized")
\ No newline at end of file
+from .doublebase_lib import warm_setup, dbaser
+
+# name -> submodule that defines it
+_LAZY_NAMES = {
+    "cold_setup": "providers", "AlphabetProvider": "providers",
+    "InProcessProvider": "providers", "HttpProvider": "providers",
+    "AsyncDbaser": "aio", "TokenScanner": "scanner",
+}
+
+__all__ = ["cold_setup", "warm_setup", "dbaser", "AlphabetProvider", "InProcessProvider", "HttpProvider",
+           "AsyncDbaser", "TokenScanner"]
+
+def __getattr__(name: str):
+    if name in _LAZY_NAMES:
+        module = importlib.import_module(f".{_LAZY_NAMES[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,149 @@
+#aio.py
+# asyncio facade over the encoder for services that encode on the event loop.
+#
+# AsyncDbaser.encode / .decode are awaitables. Calls that arrive within a
+# short window (or until max_batch calls are queued) are coalesced into one
+# encode_many / decode_many call, optionally run in a thread or process
+# executor so the loop is not blocked, and each caller's future is resolved
+# with its own result. A bad input only fails its own call: if a bulk call
+# raises, that batch is retried item by item.
+import asyncio
+from concurrent.futures import Executor
+from typing import List, Optional, Tuple
+
+from .encoder import encoder_for_config, get_encoder
+
+# Default coalescing window (seconds) and maximum calls per bulk operation.
+DEFAULT_WINDOW = 0.0005
+DEFAULT_MAX_BATCH = 1024
+
+# Bulk workers are module-level functions taking the alphabet tuple, so they
+# can be pickled into a ProcessPoolExecutor; get_encoder keeps one encoder
+# per alphabet in each worker process.
+def _encode_batch(emoji_list: Tuple[str, ...], input_bits: int, records: List[bytes]) -> list:
+    encoder = get_encoder(emoji_list, input_bits)
+    try:
+        return encoder.encode_many(b"".join(records))
+    except ValueError:
+        return [_outcome(encoder.encode, record) for record in records]
+
+def _decode_batch(emoji_list: Tuple[str, ...], input_bits: int, pairs: List[Tuple[str, str]]) -> list:
+    encoder = get_encoder(emoji_list, input_bits)
+    size = encoder.record_size
+    try:
+        buf = encoder.decode_many(pairs)
+        return [buf[i * size:(i + 1) * size] for i in range(len(pairs))]
+    except (ValueError, OverflowError):
+        return [_outcome(encoder.decode, *pair) for pair in pairs]
+
+class _Failed:
+    """Marks a per-item exception in a batch result (picklable, unlike a raised batch)."""
+    __slots__ = ("error",)
+    def __init__(self, error: Exception):
+        self.error = error
+
+def _outcome(fn, *args):
+    try:
+        return fn(*args)
+    except (ValueError, OverflowError) as e:
+        return _Failed(e)
+
+class AsyncDbaser:
+    """
+    Awaitable encode/decode for one config, with request coalescing.
+
+    window is how long (in seconds) the first queued call waits for
+    companions; max_batch flushes early once that many calls are queued.
+    executor (a ThreadPoolExecutor or ProcessPoolExecutor) runs the bulk
+    operations off the event loop; with executor=None they run inline,
+    which is cheapest for small batches.
+    """
+    def __init__(self, config: dict, input_bits: Optional[int] = None, window: float = DEFAULT_WINDOW,
+                 max_batch: int = DEFAULT_MAX_BATCH, executor: Optional[Executor] = None):
+        self.encoder = encoder_for_config(config, input_bits, "AsyncDbaser")
+        self.input_bits = self.encoder.input_bits
+        self.window = window
+        self.max_batch = max_batch
+        self.executor = executor
+        # Per direction: queued (item, future) pairs and the pending flush timer.
+        self._queues = {"encode": [], "decode": []}
+        self._timers = {"encode": None, "decode": None}
+        self._tasks = set()
+
+    # encode/decode return futures directly rather than being coroutines:
+    # awaiting them is the same for callers, but gather() over many calls
+    # then needs no wrapping task per call.
+    def encode(self, data_bytes: bytes) -> "asyncio.Future":
+        """Awaitable dbase_encode. Shorter inputs are zero-extended on the left, as in encode()."""
+        data_bytes = bytes(data_bytes)
+        size = self.encoder.record_size
+        if len(data_bytes) < size:
+            data_bytes = bytes(size - len(data_bytes)) + data_bytes
+        elif len(data_bytes) > size:
+            # Oversized inputs keep encode()'s range check and message.
+            future = asyncio.get_running_loop().create_future()
+            result = _outcome(self.encoder.encode, data_bytes)
+            if isinstance(result, _Failed): future.set_exception(result.error)
+            else: future.set_result(result)
+            return future
+        return self._submit("encode", data_bytes)
+
+    def decode(self, decimal_str: str, emoji_str: str) -> "asyncio.Future":
+        """Awaitable dbase_decode."""
+        return self._submit("decode", (decimal_str, emoji_str))
+
+    async def flush(self) -> None:
+        """Dispatches everything queued now and waits for in-flight batches."""
+        for kind in ("encode", "decode"):
+            self._dispatch(kind)
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def __aenter__(self) -> "AsyncDbaser":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.flush()
+
+    def _submit(self, kind: str, item) -> "asyncio.Future":
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._queues[kind]
+        queue.append((item, future))
+        if len(queue) >= self.max_batch:
+            self._dispatch(kind)
+        elif self._timers[kind] is None:
+            self._timers[kind] = loop.call_later(self.window, self._dispatch, kind)
+        return future
+
+    def _dispatch(self, kind: str) -> None:
+        timer = self._timers[kind]
+        if timer is not None:
+            timer.cancel()
+            self._timers[kind] = None
+        queue = self._queues[kind]
+        if not queue: return
+        self._queues[kind] = []
+        task = asyncio.get_running_loop().create_task(self._run_batch(kind, queue))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, kind: str, queue: list) -> None:
+        items = [item for item, _ in queue]
+        batch_fn = _encode_batch if kind == "encode" else _decode_batch
+        args = (self.encoder.emoji_list, self.input_bits, items)
+        try:
+            if self.executor is None:
+                results = batch_fn(*args)
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(self.executor, batch_fn, *args)
+        except Exception as e:
+            for _, future in queue:
+                if not future.done(): future.set_exception(e)
+            return
+        for (_, future), result in zip(queue, results):
+            if future.done(): continue  # cancelled by its caller
+            if isinstance(result, _Failed):
+                future.set_exception(result.error)
+            else:
+                future.set_result(result)
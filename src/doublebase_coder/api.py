@@ -3,13 +3,20 @@
 #    First, run api.py and note the URL it prints (e.g., http://127.0.0.1:51234/api/v1/ordered-set).
 #    In a new terminal window, run the client, passing that URL as an argument:
 #    python client.py http://127.0.0.1:51234/api/v1/ordered-set
+import argparse
+import atexit
 import json
 import socket
 import os
 import logging # <-- Import logging
+import signal
 import subprocess # <-- For running scraper
 import sys        # <-- To find the correct python executable
-from flask import Flask, request, jsonify
+import threading
+import time
+from flask import Flask, g, request, jsonify
+from . import metrics
+from .api_utils import SERVER_READY_PREFIX, order_emoji_sets, remove_discovery_file, write_discovery_file
 
 # --- Helper function to find a free port ---
 def find_free_port():
@@ -43,12 +50,72 @@ logging.basicConfig(
     ]
 )
 
-def load_emoji_data():
-    """Loads the emoji data from the JSON file into memory."""
+# --- Ordered-set index ---
+# emoji_data never changes after load_emoji_data(), so each distinct set
+# combination is sorted once. An entry holds the ordered list, the full
+# response pre-serialized as '{"0":..,"1":..' and the end offset of every
+# element, so a response for any count is a single string slice. The same
+# list is also pre-serialized as a JSON array '["..","..' (with its own end
+# offsets) for the multi-base /api/v1/ordered-sets endpoint.
+_ordered_set_index = {}
+_ordered_set_index_lock = threading.Lock()
+ordered_set_cache_stats = {"hits": 0, "misses": 0}
+
+def _build_ordered_set_entry(set_key):
+    ordered_list = order_emoji_sets(emoji_data, list(set_key))
+    pieces, ends, length = ["{"], [], 1
+    list_pieces, list_ends, list_length = ["["], [], 1
+    for i, emoji in enumerate(ordered_list):
+        encoded = json.dumps(emoji)
+        piece = ("," if i else "") + json.dumps(str(i)) + ":" + encoded
+        pieces.append(piece)
+        length += len(piece)
+        ends.append(length)
+        list_piece = ("," if i else "") + encoded
+        list_pieces.append(list_piece)
+        list_length += len(list_piece)
+        list_ends.append(list_length)
+    return ordered_list, "".join(pieces), ends, "".join(list_pieces), list_ends
+
+def get_ordered_set_entry(set_names):
+    """
+    Returns the (ordered_list, serialized_body, ends, serialized_list,
+    list_ends) entry for a set combination.
+    """
+    set_key = tuple(sorted(set(set_names)))
+    entry = _ordered_set_index.get(set_key)
+    if entry is not None:
+        ordered_set_cache_stats["hits"] += 1
+        return entry
+    with _ordered_set_index_lock:
+        entry = _ordered_set_index.get(set_key)
+        if entry is None:
+            ordered_set_cache_stats["misses"] += 1
+            entry = _ordered_set_index[set_key] = _build_ordered_set_entry(set_key)
+        else:
+            ordered_set_cache_stats["hits"] += 1
+    return entry
+
+def load_emoji_data(use_snapshot=False):
+    """
+    Loads the emoji data from the JSON file into memory, or from the bundled
+    snapshot (no scraping needed) with use_snapshot=True.
+    """
     global emoji_data
+    if use_snapshot:
+        from .scraper import SNAPSHOT_PATH, load_emoji_snapshot
+        try:
+            unicode_version, emoji_data = load_emoji_snapshot()
+        except (IOError, ValueError):
+            logging.error(f"Could not load the bundled emoji snapshot '{SNAPSHOT_PATH}'.", exc_info=True)
+            exit(1)
+        _ordered_set_index.clear()
+        logging.info(f"Loaded {len(emoji_data)} emoji sets from the bundled Unicode {unicode_version} snapshot.")
+        return
     try:
         with open(EMOJI_DATA_PATH, 'r', encoding='utf-8') as f:
             emoji_data = json.load(f)
+        _ordered_set_index.clear()
         logging.info(f"Successfully loaded {len(emoji_data)} emoji sets from '{EMOJI_DATA_PATH}'.")
     except FileNotFoundError:
         logging.error(f"'{EMOJI_DATA_PATH}' not found. Please run scraper.py first.")
@@ -61,6 +128,56 @@ def load_emoji_data():
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.WARNING)
 
+def ordered_set_response(data):
+    """
+    Builds the ordered-set response for a parsed JSON payload.
+    Returns (status_code, json_body); shared by the Flask and ASGI apps.
+    """
+    count = data.get('ordered_set_count') if isinstance(data, dict) else None
+    set_names = data.get('sets') if isinstance(data, dict) else None
+
+    if not isinstance(count, int) or not isinstance(set_names, list):
+        return 400, json.dumps({"error": "Invalid payload format. Required: {'ordered_set_count': int, 'sets': list}"})
+    
+    for name in set_names:
+        if name not in emoji_data:
+            return 400, json.dumps({"error": f"Set '{name}' not found. Available sets: {list(emoji_data.keys())}"})
+
+    # The server determines the order by sorting the combined set.
+    # This ensures a deterministic output for the same query.
+    # (InProcessProvider in providers.py shares api_utils.order_emoji_sets.)
+    # The sort happens once per set combination; see get_ordered_set_entry.
+    ordered_list, body, ends, _, _ = get_ordered_set_entry(set_names)
+    # Truncate to the requested count (same semantics as ordered_list[:count])
+    final_count = len(range(len(ordered_list))[:count])
+    # The response is {index: emoji}, sliced out of the pre-serialized body
+    return 200, (body[:ends[final_count - 1]] + "}" if final_count else "{}")
+
+def ordered_sets_response(data):
+    """
+    Builds the multi-base response for {"counts": [int, ...], "sets": [...]}.
+    Every base is a prefix of the same ordering, so the reply carries the
+    longest requested list once plus each count's cut point:
+    {"cuts": {"256": 256, "1024": 1024}, "emojis": [...]}, where the map for
+    a count is emojis[:cuts[count]]. Returns (status_code, json_body).
+    """
+    counts = data.get('counts') if isinstance(data, dict) else None
+    set_names = data.get('sets') if isinstance(data, dict) else None
+
+    if (not isinstance(counts, list) or not counts or not isinstance(set_names, list)
+            or not all(isinstance(c, int) and not isinstance(c, bool) and c >= 0 for c in counts)):
+        return 400, json.dumps({"error": "Invalid payload format. Required: {'counts': [non-negative int, ...], 'sets': list}"})
+
+    for name in set_names:
+        if name not in emoji_data:
+            return 400, json.dumps({"error": f"Set '{name}' not found. Available sets: {list(emoji_data.keys())}"})
+
+    ordered_list, _, _, list_body, list_ends = get_ordered_set_entry(set_names)
+    cuts = {str(c): min(c, len(ordered_list)) for c in counts}
+    longest = max(cuts.values())
+    emojis = list_body[:list_ends[longest - 1]] + "]" if longest else "[]"
+    return 200, '{"cuts":' + json.dumps(cuts) + ',"emojis":' + emojis + '}'
+
 @app.route('/api/v1/ordered-set', methods=['POST'])
 def get_ordered_emoji_set():
     """
@@ -70,76 +187,252 @@ def get_ordered_emoji_set():
     if not request.is_json:
         return jsonify({"error": "Request must be JSON"}), 400
 
-    data = request.get_json()
-    count = data.get('ordered_set_count')
-    set_names = data.get('sets')
+    status, payload = ordered_set_response(request.get_json())
+    return app.response_class(payload, status=status, mimetype="application/json")
 
-    if not isinstance(count, int) or not isinstance(set_names, list):
-        return jsonify({"error": "Invalid payload format. Required: {'ordered_set_count': int, 'sets': list}"}), 400
-    
-    combined_emojis = set()
-    for name in set_names:
-        if name in emoji_data:
-            # Add emojis from the requested set to our master set
-            combined_emojis.update(emoji_data[name])
-        else:
-            return jsonify({"error": f"Set '{name}' not found. Available sets: {list(emoji_data.keys())}"}), 400
+@app.route('/api/v1/ordered-sets', methods=['POST'])
+def get_ordered_emoji_sets():
+    """
+    Handles POST requests for several bases at once.
+    Expects JSON: {"counts": [256, 1024], "sets": ["set1", "set2"]}
+    """
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
 
-    # The server determines the order by sorting the combined set.
-    # This ensures a deterministic output for the same query.
-    ordered_list = sorted(list(combined_emojis))
-    # Truncate to the requested count
-    final_list = ordered_list[:count]
-    # Format the response as {index: emoji}
-    response_payload = {str(i): emoji for i, emoji in enumerate(final_list)}
+    status, payload = ordered_sets_response(request.get_json())
+    return app.response_class(payload, status=status, mimetype="application/json")
+
+@app.route('/api/v1/ordered-set/stats', methods=['GET'])
+def get_ordered_set_stats():
+    """Reports hit/miss counters for the ordered-set index."""
+    return jsonify({**ordered_set_cache_stats, "entries": len(_ordered_set_index)})
+
+# --- Metrics (opt-in: --metrics or DOUBLEBASE_METRICS=1) ---
+METRICS_PATH = '/metrics'
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_DISABLED_ERROR = json.dumps({"error": f"Metrics are disabled. Start the server with --metrics or set {metrics.METRICS_ENV}=1."})
+
+def _record_request(path, method, status, seconds):
+    metrics.REGISTRY.counter("doublebase_http_requests_total", path=path, method=method, status=status).inc()
+    metrics.REGISTRY.histogram("doublebase_http_request_seconds", path=path).observe(seconds)
+
+@app.before_request
+def _start_request_timer():
+    if metrics.ENABLED: g.metrics_start = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        # The route pattern, not the raw path, so unknown URLs don't add label values.
+        path = request.url_rule.rule if request.url_rule else "unmatched"
+        _record_request(path, request.method, response.status_code, time.perf_counter() - start)
+    return response
+
+@app.route(METRICS_PATH, methods=['GET'])
+def get_metrics():
+    """Request counts and latency (and any other recorded metrics) in the Prometheus text format."""
+    if not metrics.ENABLED:
+        return app.response_class(METRICS_DISABLED_ERROR, status=404, mimetype="application/json")
+    return app.response_class(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+
+# --- ASGI App (production mode) ---
+# The same endpoints as the Flask app, as a dependency-free ASGI callable so
+# they can be served by a multi-worker async server such as uvicorn.
+ORDERED_SET_PATH = '/api/v1/ordered-set'
+ORDERED_SETS_PATH = '/api/v1/ordered-sets'
+ORDERED_SET_STATS_PATH = '/api/v1/ordered-set/stats'
+_POST_HANDLERS = {ORDERED_SET_PATH: ordered_set_response, ORDERED_SETS_PATH: ordered_sets_response}
+_ASGI_PATHS = {ORDERED_SET_STATS_PATH, METRICS_PATH, *_POST_HANDLERS}
+
+async def _asgi_send_json(send, status, payload):
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": payload.encode('utf-8')})
+
+async def asgi_app(scope, receive, send):
+    """ASGI entry point: `uvicorn doublebase_coder.api:asgi_app`."""
+    if scope["type"] == "lifespan":
+        # Each worker process loads the emoji data once at startup.
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Workers don't run main()'s cold start; like it, they serve the
+                # bundled snapshot when no emoji_data.json was generated.
+                if not emoji_data: load_emoji_data(use_snapshot=not os.path.exists(EMOJI_DATA_PATH))
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+    if not metrics.ENABLED:
+        return await _asgi_http(scope, receive, send)
+
+    start, statuses = time.perf_counter(), []
+    async def send_recording_status(message):
+        if message["type"] == "http.response.start": statuses.append(message["status"])
+        await send(message)
+    try:
+        await _asgi_http(scope, receive, send_recording_status)
+    finally:
+        path = scope["path"] if scope["path"] in _ASGI_PATHS else "unmatched"
+        _record_request(path, scope["method"], statuses[0] if statuses else 500, time.perf_counter() - start)
 
-    return jsonify(response_payload)
+async def _asgi_http(scope, receive, send):
+    path, method = scope["path"], scope["method"]
+    if path == METRICS_PATH and method == "GET":
+        if not metrics.ENABLED:
+            return await _asgi_send_json(send, 404, METRICS_DISABLED_ERROR)
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", METRICS_CONTENT_TYPE.encode('ascii'))]})
+        return await send({"type": "http.response.body", "body": metrics.render().encode('utf-8')})
+    if path == ORDERED_SET_STATS_PATH and method == "GET":
+        return await _asgi_send_json(send, 200, json.dumps({**ordered_set_cache_stats, "entries": len(_ordered_set_index)}))
+    if path in (ORDERED_SET_STATS_PATH, METRICS_PATH) or (path in _POST_HANDLERS and method != "POST"):
+        return await _asgi_send_json(send, 405, json.dumps({"error": "Method not allowed"}))
+    if path not in _POST_HANDLERS:
+        return await _asgi_send_json(send, 404, json.dumps({"error": "Not found"}))
 
+    body, more_body = b"", True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+    content_type = dict(scope["headers"]).get(b"content-type", b"")
+    try:
+        if not content_type.split(b";")[0].strip().endswith(b"json"):
+            raise ValueError
+        data = json.loads(body)
+    except ValueError:
+        return await _asgi_send_json(send, 400, json.dumps({"error": "Request must be JSON"}))
+    status, payload = _POST_HANDLERS[path](data)
+    await _asgi_send_json(send, status, payload)
+
+# --- Discovery and readiness ---
+
+def _listen_socket(port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('127.0.0.1', port))
+    sock.listen(socket.SOMAXCONN)
+    sock.set_inheritable(True)  # uvicorn workers are spawned with this descriptor
+    return sock
+
+def _announce_ready(api_url, ready_stdout):
+    """Publishes the discovery file (removed again at exit) and, if asked, the readiness line."""
+    write_discovery_file(api_url)
+    atexit.register(remove_discovery_file)
+    # SIGTERM (e.g. Popen.terminate) should also run the atexit cleanup.
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    if ready_stdout:
+        print(f"{SERVER_READY_PREFIX} {api_url}", flush=True)
+        # Nothing else goes to the parent's pipe, so it never fills up.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
 
 # --- Main Application Logic ---
-def main():
+def main(argv=None):
     """
     Main function for the API server. Implements the cold start logic
     to run the scraper if its data file is missing.
+
+    By default serves the Flask development server. With --production the
+    ASGI app is served by uvicorn with --workers processes on --port.
     """
+    parser = argparse.ArgumentParser(prog="db-api-server", description="DoubleBase ordered-set API server.")
+    parser.add_argument("--production", action="store_true",
+                        help="Serve the ASGI app with uvicorn instead of Flask's development server.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes in production mode (default: 1).")
+    parser.add_argument("--port", type=int, default=None, help="Port to bind (default: a free ephemeral port).")
+    parser.add_argument("--ready-stdout", action="store_true",
+                        help=f"Print '{SERVER_READY_PREFIX} <url>' on stdout once the server is accepting connections.")
+    parser.add_argument("--emoji-test", action="append", default=[], metavar="EMOJI_TEST_TXT",
+                        help="Local emoji-test.txt to build missing emoji data from instead of downloading (repeatable).")
+    parser.add_argument("--metrics", action="store_true",
+                        help=f"Record request metrics and serve them at {METRICS_PATH} (same as {metrics.METRICS_ENV}=1).")
+    parser.add_argument("--unicode-version", default=None,
+                        help="Emoji version needed when emoji data is missing. Versions newer than the bundled "
+                             "snapshot are scraped; by default the snapshot is used.")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        os.environ[metrics.METRICS_ENV] = "1"  # inherited by uvicorn worker processes
+        metrics.enable()
+
     #
     # --- THIS IS THE API SERVER'S COLD START LOGIC ---
     #
+    use_snapshot = False
     if not os.path.exists(EMOJI_DATA_PATH):
         logging.warning("Emoji data file not found. This is a cold start for the API.")
-        logging.info("Attempting to run the scraper subprocess to generate data...")
-        try:
-            # --- START OF PATCH: Use the robust '-m' flag method ---
-            subprocess.run(
-                [sys.executable, "-m", "doublebase_coder.cli", "scrape"],
-                check=True, capture_output=True, text=True
-            )
-            # --- END OF PATCH ---
-            logging.info("Scraper subprocess completed successfully.")
-        except subprocess.CalledProcessError as e:
-            logging.error("FATAL: The scraper subprocess failed to run.", exc_info=True)
-            logging.error(f"Scraper stderr:\n{e.stderr}")
-            exit(1)
+        from .scraper import SNAPSHOT_PATH, read_snapshot_version, version_key
+        if args.emoji_test:
+            # Offline: stream the local files in-process, no scraper subprocess or download.
+            from .scraper import ingest_emoji_test_files
+            logging.info(f"Building emoji data from local files: {', '.join(args.emoji_test)}")
+            if ingest_emoji_test_files(args.emoji_test, EMOJI_DATA_PATH) is None:
+                logging.error("FATAL: Could not build emoji data from the local files.")
+                exit(1)
+        elif os.path.exists(SNAPSHOT_PATH) and (args.unicode_version is None or
+                version_key(args.unicode_version) <= version_key(read_snapshot_version())):
+            # The bundled snapshot covers the request: serve it directly, no scraping.
+            use_snapshot = True
+        else:
+            logging.info("Attempting to run the scraper subprocess to generate data...")
+            command = [sys.executable, "-m", "doublebase_coder.cli", "scrape"]
+            if args.unicode_version:
+                command += ["--unicode-version", args.unicode_version]
+            try:
+                # --- START OF PATCH: Use the robust '-m' flag method ---
+                subprocess.run(command, check=True, capture_output=True, text=True)
+                # --- END OF PATCH ---
+                logging.info("Scraper subprocess completed successfully.")
+            except subprocess.CalledProcessError as e:
+                logging.error("FATAL: The scraper subprocess failed to run.", exc_info=True)
+                logging.error(f"Scraper stderr:\n{e.stderr}")
+                exit(1)
     else:
         logging.info("Emoji data file found. This is a warm start for the API.")
 
     # Now that data is guaranteed to exist, load it and start the server.
-    load_emoji_data()
+    load_emoji_data(use_snapshot)
 
     # Disable Flask's default verbose logging to avoid duplication with our logger
     log = logging.getLogger('werkzeug')
     log.setLevel(logging.WARNING)
     
-    port = find_free_port()
+    # Bind and listen before announcing anything: once the URL is published,
+    # connections queue in the backlog even before the serve loop starts.
+    sock = _listen_socket(args.port or 0)
+    port = sock.getsockname()[1]
     api_url = f"http://127.0.0.1:{port}/api/v1/ordered-set"
     
     logging.info("="*50)
     logging.info("DoubleBase API Server is starting...")
+    if args.production:
+        logging.info(f"Production mode: uvicorn with {args.workers} worker(s).")
     # This specific log message is what our api_utils.py will search for
     logging.info(f"Send POST requests to: {api_url}")
     logging.info("="*50)
-    
-    app.run(host='127.0.0.1', port=port)
+
+    if args.production:
+        try:
+            import uvicorn
+        except ImportError:
+            logging.error("Production mode requires uvicorn: pip install 'doublebase-coder[server]'")
+            exit(1)
+    _announce_ready(api_url, args.ready_stdout)
+
+    if args.production:
+        uvicorn.run("doublebase_coder.api:asgi_app", fd=sock.fileno(),
+                    workers=args.workers, log_level="warning")
+    else:
+        from werkzeug.serving import make_server
+        make_server('127.0.0.1', port, app, threaded=True, fd=sock.fileno()).serve_forever()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,33 +1,154 @@
+import json
 import os
 import re
-from typing import Optional
+import weakref
+from typing import Dict, List, Optional
 
-def find_latest_api_url() -> Optional[str]:
-    """
-    Reads the 'api.log' file in the same directory to find the most
-    recent URL the server was started on.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+EMOJI_DATA_PATH = os.path.join(SCRIPT_DIR, "emoji_data.json")
 
-    Returns:
-        The URL string if found, otherwise None.
+def order_emoji_sets(emoji_data: Dict[str, List[str]], set_names: List[str]) -> List[str]:
+    """
+    Returns the server's canonical ordering for a combination of emoji sets:
+    the sorted union of every named set. Raises KeyError for an unknown set.
     """
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    log_file_path = os.path.join(script_dir, 'api.log')
-    
-    if not os.path.exists(log_file_path):
+    combined_emojis = set()
+    for name in set_names:
+        combined_emojis.update(emoji_data[name])
+    return sorted(combined_emojis)
+
+# --- Server discovery ---
+# A running server publishes {"url", "pid"} in a small discovery file, written
+# atomically once its socket is listening and removed on exit, so finding it
+# is one small read. api.log is only scanned (from the end, block by block)
+# as a fallback for servers that predate the discovery file.
+DISCOVERY_PATH = os.path.join(SCRIPT_DIR, "api_server.json")
+LOG_FILE_PATH = os.path.join(SCRIPT_DIR, "api.log")
+_LOG_URL_PATTERN = re.compile(r"Send POST requests to: (http://127\.0\.0\.1:\d+/api/v1/ordered-set)")
+_LOG_SCAN_BLOCK = 8192
+
+# With --ready-stdout the server prints "<SERVER_READY_PREFIX> <url>" once it accepts connections.
+SERVER_READY_PREFIX = "DOUBLEBASE_API_READY"
+
+def write_discovery_file(url: str, path: str = DISCOVERY_PATH) -> None:
+    """Atomically publishes this process as the server listening at `url`."""
+    from .fileutil import atomic_write
+    with atomic_write(path, 'w', encoding='utf-8') as f:
+        json.dump({"url": url, "pid": os.getpid()}, f)
+
+def remove_discovery_file(path: str = DISCOVERY_PATH) -> None:
+    """Removes the discovery file if it still belongs to this process."""
+    info = read_discovery_file(path)
+    if info and info.get("pid") == os.getpid():
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def read_discovery_file(path: str = DISCOVERY_PATH) -> Optional[dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+    except (IOError, ValueError):
         return None
+    return info if isinstance(info, dict) and "url" in info else None
 
-    # Regex to capture the specific URL from our log message
-    url_pattern = re.compile(r"Send POST requests to: (http://127\.0\.0\.1:\d+/api/v1/ordered-set)")
+def _pid_alive(pid) -> bool:
+    if not isinstance(pid, int) or pid <= 0: return False
+    if os.name == "nt": return True  # no cheap check; callers still verify the URL
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
 
+def _last_logged_url(log_file_path: str) -> Optional[str]:
+    """Finds the newest URL line in the log by reading fixed-size blocks backwards from the end."""
     try:
-        with open(log_file_path, 'r', encoding='utf-8') as f:
-            # Read lines and reverse them to find the latest entry first
-            for line in reversed(f.readlines()):
-                match = url_pattern.search(line)
-                if match:
-                    # Found the latest URL, return it
-                    return match.group(1)
+        with open(log_file_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos, carry = f.tell(), b""
+            while pos > 0:
+                step = min(_LOG_SCAN_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + carry).split(b"\n")
+                # The first piece may be a partial line; keep it for the next block.
+                carry = lines.pop(0) if pos > 0 else b""
+                for line in reversed(lines):
+                    match = _LOG_URL_PATTERN.search(line.decode('utf-8', errors='replace'))
+                    if match: return match.group(1)
     except IOError:
         return None # Failed to read file
+    return None
 
-    return None # No URL found in the entire file
\ No newline at end of file
+def find_latest_api_url() -> Optional[str]:
+    """
+    Returns the URL of the most recently started server: from the discovery
+    file when its process is still alive, otherwise from the last URL line
+    in 'api.log' (read backwards). Returns None if neither has one.
+    """
+    info = read_discovery_file()
+    if info and _pid_alive(info.get("pid")):
+        return info["url"]
+    if not os.path.exists(LOG_FILE_PATH):
+        return None
+    return _last_logged_url(LOG_FILE_PATH)
+
+# --- Shared HTTP client ---
+# One pooled httpx.AsyncClient (keep-alive connections, timeouts set once) is
+# created lazily per running event loop and reused by every alphabet fetch.
+# httpx is only imported when a client is first needed.
+HTTP_TIMEOUT = 10.0          # seconds, per read/write/pool wait
+HTTP_CONNECT_TIMEOUT = 2.0   # seconds
+HTTP_MAX_CONNECTIONS = 16
+HTTP_RETRIES = 3             # extra attempts on connection errors, timeouts and 5xx responses
+HTTP_BACKOFF = 0.1           # seconds before the first retry, doubled after each
+
+# event loop -> client; an AsyncClient's connections belong to the loop that opened them.
+_http_clients = weakref.WeakKeyDictionary()
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Returns the shared client for the running event loop, creating it on first use."""
+    import asyncio
+    import httpx
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_CONNECTIONS),
+        )
+        _http_clients[loop] = client
+    return client
+
+async def close_http_client() -> None:
+    """Closes the running loop's shared client (e.g. on application shutdown)."""
+    import asyncio
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+async def post_json(url: str, payload: dict, timeout: Optional[float] = None, retries: int = HTTP_RETRIES):
+    """
+    POSTs `payload` as JSON with the shared client and returns the decoded
+    response. Connection errors, timeouts and 5xx responses are retried with
+    exponential backoff; the last failure is raised as an httpx error.
+    """
+    import asyncio
+    import httpx
+    client = get_http_client()
+    request_timeout = httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+    delay = HTTP_BACKOFF
+    for attempt in range(retries + 1):
+        try:
+            response = await client.post(url, json=payload, timeout=request_timeout)
+            if response.status_code < 500 or attempt == retries:
+                response.raise_for_status()
+                return response.json()
+        except httpx.TransportError:
+            if attempt == retries: raise
+        await asyncio.sleep(delay)
+        delay *= 2
@@ -0,0 +1,115 @@
+#binary_cache.py
+# A compact, mmap-friendly alternative to the JSON dbase_cache file.
+#
+# Layout (all integers little-endian):
+#    header   : magic (8 bytes) | format version (u32) | number of bases (u32)
+#    index    : one entry per base -> base key (u32) | emoji count (u32) |
+#               offsets position (u64) | blob position (u64)
+#    per base : (emoji count + 1) u32 UTF-8 byte offsets, then the packed UTF-8 blob
+#
+# Only the header and index are parsed on open; a base's alphabet is decoded
+# from the mapped file the first time that base is looked up.
+import json
+import mmap
+import struct
+from collections.abc import Mapping
+from typing import Iterator
+
+from .encoder import _as_emoji_tuple, config_alphabet
+from .fileutil import atomic_write
+from .prefix_cache import PrefixCache, is_prefix_document
+
+MAGIC = b"DBCACHE\x00"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sII")
+_INDEX_ENTRY = struct.Struct("<IIQQ")
+
+def is_binary_cache(path: str) -> bool:
+    """Returns True if the file at `path` starts with the binary cache magic bytes."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except IOError:
+        return False
+
+class BinaryCache(Mapping):
+    """
+    Read-only view of a binary cache file, shaped like the JSON cache:
+    cache["256"] -> {"emoji_count": 256, "emoji_map": {"0": ..., ...}}.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"'{path}' is too short to be a binary cache.")
+        magic, version, base_count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not a binary cache (bad magic bytes).")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary cache version {version} in '{path}'.")
+        self._index = {}
+        for i in range(base_count):
+            base, count, offsets_pos, blob_pos = _INDEX_ENTRY.unpack_from(self._mm, _HEADER.size + i * _INDEX_ENTRY.size)
+            self._index[str(base)] = (count, offsets_pos, blob_pos)
+
+    def emoji_list(self, key: str) -> list:
+        """Decodes one base's alphabet, in index order, straight from the mapped file."""
+        count, offsets_pos, blob_pos = self._index[key]
+        offsets = struct.unpack_from(f"<{count + 1}I", self._mm, offsets_pos)
+        blob = self._mm[blob_pos:blob_pos + offsets[-1]]
+        return [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+
+    def __getitem__(self, key: str) -> dict:
+        emojis = self.emoji_list(key)
+        return {"emoji_count": len(emojis), "emoji_map": {str(i): e for i, e in enumerate(emojis)}}
+
+    def __contains__(self, key) -> bool:
+        # Overridden so membership tests read the index instead of decoding the alphabet.
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self) -> None:
+        self._mm.close()
+
+def write_binary_cache(configs: Mapping, path: str) -> None:
+    """Writes `configs` (the JSON cache shape, keyed by base) to `path` in binary form."""
+    entries = []
+    for key in configs:
+        if not str(key).isdigit():
+            raise ValueError(f"Binary caches require integer base keys, got '{key}'.")
+        alphabet = config_alphabet(configs[key])
+        if alphabet is None:
+            raise ValueError(f"Cache entry '{key}' has no 'emoji_map'.")
+        encoded = [emoji.encode('utf-8') for emoji in _as_emoji_tuple(alphabet)]
+        entries.append((int(key), encoded))
+
+    pos = _HEADER.size + len(entries) * _INDEX_ENTRY.size
+    index, sections = [], []
+    for base, encoded in entries:
+        offsets = [0]
+        for e in encoded: offsets.append(offsets[-1] + len(e))
+        offset_bytes = struct.pack(f"<{len(offsets)}I", *offsets)
+        index.append(_INDEX_ENTRY.pack(base, len(encoded), pos, pos + len(offset_bytes)))
+        sections.append(offset_bytes + b"".join(encoded))
+        pos += len(sections[-1])
+
+    # Replaced atomically: readers that already mapped the old file keep a valid view of it.
+    with atomic_write(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(entries)))
+        f.write(b"".join(index))
+        f.write(b"".join(sections))
+
+def convert_json_cache(json_path: str, binary_path: str) -> None:
+    """Converts an existing JSON dbase cache file (either layout) into the binary format."""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        configs = json.load(f)
+    if is_prefix_document(configs):
+        configs = PrefixCache(configs)
+    write_binary_cache(configs, binary_path)
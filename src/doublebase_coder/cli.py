@@ -2,33 +2,269 @@
 
 # We import the original logic and just call it.
 # Note the use of relative imports (`.`) since they are in the same package.
+# The scraper and API modules are imported inside their entry points, so the
+# streaming encode/decode commands don't pay for Flask or api.log setup.
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import re
 import sys
-from .scraper import scrape_and_process_emojis
-from .api import main as run_api_logic
+from .binary_cache import convert_json_cache
+
+# Lines (or raw records) handed to the batch encoder/decoder at a time.
+STREAM_BATCH_SIZE = 8192
 
 # These functions are the entry points registered in pyproject.toml
-def run_scraper_entrypoint():
-    """Entry point for the 'db-scrape' command."""
+def run_scraper_entrypoint(argv=None):
+    """
+    Entry point for the 'db-scrape' command. Downloads emoji-test.txt by
+    default; with --input, merges local emoji-test.txt files instead (no network).
+    """
+    from .scraper import (DEFAULT_UNICODE_VERSION, OUTPUT_FILE_PATH, SNAPSHOT_PATH, ingest_emoji_test_files,
+                          read_emoji_test_file, scrape_and_process_emojis, write_emoji_snapshot)
+    parser = argparse.ArgumentParser(prog="db-scrape", description="Build emoji_data.json from Unicode's emoji-test.txt.")
+    parser.add_argument("--input", "-i", action="append", default=[], metavar="EMOJI_TEST_TXT",
+                        help="Local emoji-test.txt to merge into the existing data (repeatable). Skips the download.")
+    parser.add_argument("--output", "-o", default=None,
+                        help="File to write (default: the package's emoji_data.json, or its snapshot with --snapshot).")
+    parser.add_argument("--unicode-version", default=DEFAULT_UNICODE_VERSION,
+                        help=f"Emoji version to download, or the newest version kept with --snapshot (default: {DEFAULT_UNICODE_VERSION}).")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="Write the bundled emoji snapshot from the --input files instead of emoji_data.json.")
+    args = parser.parse_args(argv)
     print("--- Running DoubleBase Scraper via entry point ---")
-    scrape_and_process_emojis()
+    if args.snapshot:
+        if not args.input:
+            parser.error("--snapshot needs at least one --input file.")
+        emojis_by_version = {}
+        for path in args.input:
+            for version, emojis in read_emoji_test_file(path).items():
+                emojis_by_version.setdefault(version, set()).update(emojis)
+        write_emoji_snapshot(emojis_by_version, args.unicode_version, args.output or SNAPSHOT_PATH)
+        print(f"Wrote Unicode {args.unicode_version} snapshot to '{args.output or SNAPSHOT_PATH}'")
+        return
+    args.output = args.output or OUTPUT_FILE_PATH
+    if args.input:
+        if ingest_emoji_test_files(args.input, args.output) is None:
+            sys.exit(1)
+    else:
+        scrape_and_process_emojis(args.output, args.unicode_version)
 
-def run_api_server_entrypoint():
+def run_api_server_entrypoint(argv=None):
     """Entry point for the 'db-api-server' command."""
-    run_api_logic()
+    from .api import main as run_api_logic
+    run_api_logic(argv)
+
+def run_convert_cache_entrypoint(json_path: str, binary_path: str):
+    """Converts a JSON dbase cache into the memory-mapped binary format."""
+    convert_json_cache(json_path, binary_path)
+    print(f"Converted '{json_path}' -> '{binary_path}'")
+
+def run_migrate_cache_entrypoint(cache_path: str, target_path: str = None):
+    """Rewrites a per-base JSON (or binary) cache in the prefix-sharing JSON layout."""
+    from .prefix_cache import migrate_cache
+    cache = migrate_cache(cache_path, target_path)
+    print(f"Migrated '{cache_path}' -> '{target_path or cache_path}' "
+          f"({len(cache)} bases sharing {len(cache.alphabets)} alphabet(s))")
+
+# --- Streaming encode/decode ---
+
+def _stream_parser(prog: str, description: str) -> argparse.ArgumentParser:
+    from .doublebase_lib import DEFAULT_CACHE_FILENAME
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    parser.add_argument("--base", type=int, default=256, help="Emoji base to use (default: 256).")
+    parser.add_argument("--bits", type=int, default=128,
+                        help="Checksum width in bits, e.g. 160 for sha1sum or 256 for sha256sum (default: 128).")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_FILENAME,
+                        help=f"Cache file to load the base from; created via cold setup if needed (default: {DEFAULT_CACHE_FILENAME}).")
+    return parser
+
+def _load_config(prog: str, base: int, cache_path: str) -> dict:
+    """Loads (or cold-fetches) the config for one base."""
+    from .doublebase_lib import cold_setup, warm_setup
+    # Setup chatter goes to stderr; stdout carries only the data stream.
+    with contextlib.redirect_stdout(sys.stderr):
+        configs = warm_setup(cache_path)
+        if configs is None or str(base) not in configs:
+            configs = asyncio.run(cold_setup([base], cache_path))
+    if not configs or str(base) not in configs:
+        print(f"{prog}: could not load an emoji map for base {base}.", file=sys.stderr)
+        sys.exit(1)
+    return configs[str(base)]
+
+def _load_batch_coder(prog: str, base: int, cache_path: str, input_bits: int):
+    """Loads (or cold-fetches) one base and returns its batch encode/decode pair."""
+    from .doublebase_lib import dbaser
+    config = _load_config(prog, base, cache_path)
+    try:
+        return dbaser(config, batch=True, input_bits=input_bits)
+    except ValueError as e:
+        print(f"{prog}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def _batches(iterable, size: int):
+    iterator = iter(iterable)
+    return iter(lambda: list(itertools.islice(iterator, size)), [])
+
+def _utf8_stdout():
+    return io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='\n', write_through=False)
+
+def _utf8_stdin():
+    return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline=None)
+
+def _fail(prog: str, line_number: int, message) -> None:
+    print(f"{prog}: line {line_number}: {message}", file=sys.stderr)
+    sys.exit(1)
+
+def run_encode_entrypoint(argv=None):
+    """
+    Entry point for the 'db-encode' command. Streams stdin to stdout as
+    '<decimal> | <emoji>' lines. Input is one hex checksum per line, raw
+    fixed-size records, or md5sum/sha256sum-style '<hex>  <name>' lines (the
+    name is carried through). --bits sets the checksum width.
+    """
+    parser = _stream_parser("db-encode", "Encode checksums from stdin into doublebase form.")
+    parser.add_argument("--input-format", choices=["hex", "raw", "sum"], default="hex",
+                        help="hex: one checksum per line; raw: packed records; sum: '<hex>  <name>' lines.")
+    args = parser.parse_args(argv)
+    encode_many, _ = _load_batch_coder("db-encode", args.base, args.cache, args.bits)
+    record_size = args.bits // 8
+    out = _utf8_stdout()
+
+    if args.input_format == "raw":
+        stdin = sys.stdin.buffer
+        for chunk in iter(lambda: stdin.read(record_size * STREAM_BATCH_SIZE), b""):
+            try:
+                pairs = encode_many(chunk)
+            except ValueError as e:
+                print(f"db-encode: {e}", file=sys.stderr)
+                sys.exit(1)
+            out.write("".join([f"{dec} | {emo}\n" for dec, emo in pairs]))
+        out.flush()
+        return
+
+    line_number = 0
+    for lines in _batches(_utf8_stdin(), STREAM_BATCH_SIZE):
+        records, rests = [], []
+        for line in lines:
+            line_number += 1
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue  # e.g. a trailing blank line at the end of a list
+            if args.input_format == "sum":
+                split_at = len(line.split(None, 1)[0])
+                hex_part, rest = line[:split_at], line[split_at:]
+            else:
+                hex_part, rest = line.strip(), ""
+            if hex_part.startswith("0x"): hex_part = hex_part[2:]
+            try:
+                record = bytes.fromhex(hex_part)
+            except ValueError:
+                _fail("db-encode", line_number, f"not a hex checksum: '{hex_part}'")
+            if len(record) != record_size:
+                _fail("db-encode", line_number, f"expected {2 * record_size} hex digits ({args.bits} bits), got {len(hex_part)}")
+            records.append(record)
+            rests.append(rest)
+        pairs = encode_many(b"".join(records))
+        out.write("".join([f"{dec} | {emo}{rest}\n" for (dec, emo), rest in zip(pairs, rests)]))
+    out.flush()
+
+# '<decimal> | <emoji>' followed by anything that starts with whitespace (e.g. a file name).
+_ENCODED_LINE = re.compile(r"^\s*(\d+) \| (\S+)(.*)$")
+
+def run_decode_entrypoint(argv=None):
+    """
+    Entry point for the 'db-decode' command. Streams '<decimal> | <emoji>'
+    lines from stdin back to hex lines (keeping any trailing text) or to raw
+    fixed-size records.
+    """
+    parser = _stream_parser("db-decode", "Decode doublebase lines from stdin back into checksums.")
+    parser.add_argument("--output-format", choices=["hex", "raw"], default="hex",
+                        help="hex: '<hex><trailing text>' lines; raw: packed records.")
+    args = parser.parse_args(argv)
+    _, decode_many = _load_batch_coder("db-decode", args.base, args.cache, args.bits)
+    record_size = args.bits // 8
+    out = sys.stdout.buffer if args.output_format == "raw" else _utf8_stdout()
+
+    line_number = 0
+    for lines in _batches(_utf8_stdin(), STREAM_BATCH_SIZE):
+        pairs, rests = [], []
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            match = _ENCODED_LINE.match(line.rstrip("\n"))
+            if not match:
+                _fail("db-decode", line_number, f"not a '<decimal> | <emoji>' line: '{line.rstrip()}'")
+            pairs.append((match.group(1), match.group(2)))
+            rests.append(match.group(3))
+        try:
+            records = decode_many(pairs)
+        except (ValueError, OverflowError) as e:
+            _fail("db-decode", line_number - len(lines) + 1, f"(batch starting here) {e}")
+        if args.output_format == "raw":
+            out.write(records)
+        else:
+            out.write("".join([f"{records[i * record_size:(i + 1) * record_size].hex()}{rest}\n" for i, rest in enumerate(rests)]))
+    out.flush()
+
+def run_scan_entrypoint(argv=None):
+    """
+    Entry point for the 'db-scan' command. Finds every '<decimal> | <emoji>'
+    token in the given text files (or stdin) and prints one
+    '<file>:<offset>: <hex>' line per token, streaming in bounded memory.
+    """
+    from .scanner import DEFAULT_SEPARATOR, TokenScanner
+    parser = _stream_parser("db-scan", "Find and decode doublebase tokens embedded in text.")
+    parser.add_argument("--separator", default=DEFAULT_SEPARATOR,
+                        help=f"Text between the decimal and emoji halves (default: '{DEFAULT_SEPARATOR}').")
+    parser.add_argument("files", nargs="*", help="Text files to scan (default: stdin). Offsets count characters.")
+    args = parser.parse_args(argv)
+    config = _load_config("db-scan", args.base, args.cache)
+    try:
+        scanner = TokenScanner(config, args.bits, args.separator)
+    except ValueError as e:
+        print(f"db-scan: {e}", file=sys.stderr)
+        sys.exit(1)
+    out = _utf8_stdout()
+    sources = [(path, None) for path in args.files] or [("-", _utf8_stdin())]
+    for name, stream in sources:
+        tokens = scanner.scan(stream) if stream is not None else scanner.scan_file(name)
+        for batch in _batches(tokens, STREAM_BATCH_SIZE):
+            out.write("".join([f"{name}:{start}: {data.hex()}\n" for start, _, data in batch]))
+    out.flush()
 
 # --- START OF PATCH: Main execution block for direct calls ---
 # This block runs when you execute `python -m doublebase_coder.cli server`
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("CLI Error: No command provided. Use 'server' or 'scrape'.", file=sys.stderr)
+        print("CLI Error: No command provided. Use 'server', 'scrape', 'encode', 'decode', 'scan', 'convert-cache' or 'migrate-cache'.", file=sys.stderr)
         sys.exit(1)
 
     command = sys.argv[1]
     if command == "server":
-        run_api_server_entrypoint()
+        run_api_server_entrypoint(sys.argv[2:])
     elif command == "scrape":
-        run_scraper_entrypoint()
+        run_scraper_entrypoint(sys.argv[2:])
+    elif command == "encode":
+        run_encode_entrypoint(sys.argv[2:])
+    elif command == "decode":
+        run_decode_entrypoint(sys.argv[2:])
+    elif command == "scan":
+        run_scan_entrypoint(sys.argv[2:])
+    elif command == "convert-cache":
+        if len(sys.argv) != 4:
+            print("Usage: python -m doublebase_coder.cli convert-cache <cache.json> <cache.dbc>", file=sys.stderr)
+            sys.exit(1)
+        run_convert_cache_entrypoint(sys.argv[2], sys.argv[3])
+    elif command == "migrate-cache":
+        if len(sys.argv) not in (3, 4):
+            print("Usage: python -m doublebase_coder.cli migrate-cache <cache.json> [<migrated.json>]", file=sys.stderr)
+            sys.exit(1)
+        run_migrate_cache_entrypoint(*sys.argv[2:])
     else:
         print(f"CLI Error: Unknown command '{command}'.", file=sys.stderr)
         sys.exit(1)
-# --- END OF PATCH ---
\ No newline at end of file
+# --- END OF PATCH ---
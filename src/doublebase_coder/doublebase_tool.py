@@ -8,8 +8,8 @@ import httpx  # Using async-native httpx
 import regex  # Using grapheme-group aware emoji sequence indexing
 from typing import List, Tuple, Dict
 
-# NEW: Import our URL discovery utility
-from api_utils import find_latest_api_url
+# NEW: Import our URL discovery utility and the shared, pooled HTTP client
+from api_utils import find_latest_api_url, post_json
 
 # (The HybridBaseEncoder class remains exactly the same as the previous version)
 class HybridBaseEncoder:
@@ -75,19 +75,16 @@ async def get_emoji_map_from_api_async(api_url: str, count: int, sets: list) ->
     """
     payload = {"ordered_set_count": count, "sets": sets}
     print(f"--> Querying API at {api_url} for {count} emojis from sets {sets}...")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(api_url, json=payload, timeout=5.0)
-            response.raise_for_status()
-            emoji_map = response.json()
-            if len(emoji_map) < count:
-                print(f"Warning: Requested {count}, but API only returned {len(emoji_map)}.")
-            print(f"--> Successfully received map with {len(emoji_map)} emojis.")
-            return emoji_map
-        except httpx.RequestError as e:
-            print(f"\nFATAL: Could not connect to API at {e.request.url}.")
-            print("Is the api.py server running?")
-            sys.exit(1)
+    try:
+        emoji_map = await post_json(api_url, payload, timeout=5.0)
+        if len(emoji_map) < count:
+            print(f"Warning: Requested {count}, but API only returned {len(emoji_map)}.")
+        print(f"--> Successfully received map with {len(emoji_map)} emojis.")
+        return emoji_map
+    except httpx.RequestError as e:
+        print(f"\nFATAL: Could not connect to API at {e.request.url}.")
+        print("Is the api.py server running?")
+        sys.exit(1)
 
 # NEW: Main function is now async
 async def main():
@@ -0,0 +1,529 @@
+#encoder.py
+# The pure-math core: mixed decimal/emoji radix conversion, with no network,
+# async or grapheme-segmentation dependencies, so it imports in microseconds.
+import collections.abc
+import functools
+import itertools
+import math
+import threading
+import time
+from typing import List, Tuple, Dict, Optional, Iterator, Sequence, Union
+
+from . import metrics
+
+# NumPy is optional: batch calls use it for a vectorized path when present.
+_numpy = None
+
+def _get_numpy():
+    """Imports NumPy on first use; returns None if it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+# ==============================================================================
+# SECTION 1: INTERNAL CORE LOGIC (The Encoder Class)
+# ==============================================================================
+
+DEFAULT_INPUT_BITS = 128
+
+# Blocks per encode_many/decode_many call when streaming long inputs.
+STREAM_BATCH_RECORDS = 4096
+
+# Upper bound on base**k for a k-digit lookup table.
+_DIGIT_TABLE_LIMIT = 1 << 16
+
+@functools.lru_cache(maxsize=None)
+def _digit_table(base: int, k: int) -> bytes:
+    """Every k-digit base-`base` number in numeric order, one byte per digit."""
+    return bytes(d for digits in itertools.product(range(base), repeat=k) for d in digits)
+
+def _radix_plan(base: int, digits: int) -> List[Tuple[int, int, Optional[bytes]]]:
+    """
+    Splits `digits` base-`base` digits into chunks of k digits, least significant
+    first. Each chunk is (k, base**k, table) so one divmod by base**k plus one
+    table slice yields k digits. Bases above 256 don't fit a byte table; their
+    chunks are single digits with table None.
+    """
+    k = 1
+    if base <= 256:
+        while k < digits and base ** (k + 1) <= _DIGIT_TABLE_LIMIT: k += 1
+    sizes = [k] * (digits // k) + ([digits % k] if digits % k else [])
+    return [(size, base ** size, _digit_table(base, size) if base <= 256 else None) for size in sizes]
+
+# Key under which a trie node stores the index of the emoji ending there.
+_TRIE_END = ""
+
+def _build_emoji_trie(emojis: List[str]) -> dict:
+    """Builds a code-point trie mapping each emoji in `emojis` to its index."""
+    root = {}
+    for index, emoji in enumerate(emojis):
+        node = root
+        for ch in emoji: node = node.setdefault(ch, {})
+        node[_TRIE_END] = index
+    return root
+
+class UnknownEmojiError(ValueError):
+    """Raised when an emoji string contains a sequence outside the encoder's alphabet."""
+    def __init__(self, emoji_str: str, offset: int):
+        self.emoji_str = emoji_str
+        self.offset = offset
+        super().__init__(f"Unknown emoji at offset {offset} (U+{ord(emoji_str[offset]):04X}) in '{emoji_str}'")
+    def __reduce__(self):
+        # Rebuild from the constructor arguments so the error survives pickling (process pools).
+        return (type(self), (self.emoji_str, self.offset))
+
+class AlphabetView(collections.abc.Sequence):
+    """
+    Zero-copy view of the first `length` emojis of a shared ordered alphabet.
+    Every base fetched for the same emoji sets is a prefix of one sorted list,
+    so a prefix cache holds that list once and hands each base a view of it.
+    Views compare and hash by the emojis in view (the hash is computed once),
+    so views from two loads of the same cache share one encoder.
+    """
+    __slots__ = ("alphabet", "length", "_hash")
+    def __init__(self, alphabet: Tuple[str, ...], length: int):
+        if not 0 <= length <= len(alphabet):
+            raise ValueError(f"View length {length} is outside the alphabet's {len(alphabet)} emojis.")
+        self.alphabet = alphabet
+        self.length = length
+        self._hash = None
+    def __len__(self) -> int:
+        return self.length
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.alphabet[:self.length][index]
+        if index < 0: index += self.length
+        if not 0 <= index < self.length: raise IndexError("AlphabetView index out of range")
+        return self.alphabet[index]
+    def __iter__(self) -> Iterator[str]:
+        return itertools.islice(self.alphabet, self.length)
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, AlphabetView) or self.length != other.length: return False
+        return self.alphabet is other.alphabet or all(a == b for a, b in zip(self, other))
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(tuple(self))
+        return self._hash
+    def __reduce__(self):
+        # Pickle (e.g. for process pools) only the emojis in view, as a plain tuple.
+        return (tuple, (tuple(self),))
+    def __repr__(self) -> str:
+        return f"AlphabetView({self.length} of {len(self.alphabet)} emojis)"
+
+def config_alphabet(config) -> Optional[Union[Dict[str, str], Sequence[str]]]:
+    """
+    Returns a config's alphabet: its "emoji_list" (a sequence, e.g. an
+    AlphabetView from a prefix cache) if present, else its "emoji_map", else None.
+    """
+    if not config: return None
+    if "emoji_list" in config: return config["emoji_list"]
+    return config["emoji_map"] if "emoji_map" in config else None
+
+def _as_emoji_tuple(emoji_map: Union[Dict[str, str], Sequence[str]]) -> Sequence[str]:
+    """
+    Accepts the JSON config shape {"0": emoji, ...} or a plain sequence of
+    emojis; AlphabetViews are kept as they are.
+    """
+    if isinstance(emoji_map, AlphabetView):
+        return emoji_map
+    if isinstance(emoji_map, dict):
+        try:
+            return tuple([emoji_map[str(i)] for i in range(len(emoji_map))])
+        except KeyError:
+            raise ValueError("Emoji map keys must be the indices '0' .. 'N-1'.")
+    return tuple(emoji_map)
+
+class _HybridBaseEncoder:
+    """
+    Internal class to handle the encoding/decoding mathematics.
+    The alphabet is held as a tuple (or an AlphabetView over a shared one)
+    indexed by digit for encoding, and a code-point trie for decoding; no
+    str-keyed maps.
+    """
+    def __init__(self, emoji_map: Union[Dict[str, str], Sequence[str]], input_bits: int = DEFAULT_INPUT_BITS):
+        if input_bits <= 0 or input_bits % 8:
+            raise ValueError(f"input_bits must be a positive multiple of 8, got {input_bits}.")
+        self.emoji_list = _as_emoji_tuple(emoji_map)
+        # Digits are always < emoji_count, so a view's encoding table can be its whole shared tuple.
+        self._table = self.emoji_list.alphabet if isinstance(self.emoji_list, AlphabetView) else self.emoji_list
+        self.emoji_count = len(self.emoji_list)
+        if self.emoji_count == 0: raise ValueError("Emoji map cannot be empty.")
+        self.decimal_base = 10
+        self.input_bits = input_bits
+        self.max_input_value = 2**self.input_bits - 1
+        self.N = self._find_minimum_N()
+        self.half_N = self.N // 2
+        self.record_size = self.input_bits // 8
+        self.emoji_capacity = self.emoji_count ** self.half_N
+        self._emoji_plan = _radix_plan(self.emoji_count, self.half_N)
+        self._emoji_trie = _build_emoji_trie(self.emoji_list)
+    @functools.cached_property
+    def emoji_map(self) -> Dict[str, str]:
+        """The alphabet in the JSON config shape {"0": emoji, ...} (built on first access)."""
+        return {str(i): emoji for i, emoji in enumerate(self.emoji_list)}
+    @functools.cached_property
+    def emoji_index(self) -> Dict[str, int]:
+        """emoji -> digit (built on first access; decoding uses the trie)."""
+        return {emoji: i for i, emoji in enumerate(self.emoji_list)}
+    @functools.cached_property
+    def reverse_emoji_map(self) -> Dict[str, str]:
+        """The JSON-shaped reverse map {emoji: "index"} (built on first access)."""
+        return {emoji: str(i) for emoji, i in self.emoji_index.items()}
+    def _find_minimum_N(self) -> int:
+        # Smallest half with (decimal_base * emoji_count) ** half >= 2**input_bits,
+        # estimated with logarithms, then corrected with exact integer checks.
+        radix, target = self.decimal_base * self.emoji_count, 2 ** self.input_bits
+        half = max(1, math.ceil(self.input_bits / math.log2(radix)))
+        while radix ** half < target: half += 1
+        while half > 1 and radix ** (half - 1) >= target: half -= 1
+        return 2 * half
+    @staticmethod
+    def _digits(value: int, plan: List[Tuple[int, int, Optional[bytes]]]) -> List[int]:
+        """Expands `value` into digits (most significant first) using a chunked radix plan."""
+        if plan[0][2] is None:
+            digits = [0] * len(plan)
+            radix = plan[0][1]
+            for i in range(len(plan) - 1, -1, -1):
+                value, digits[i] = divmod(value, radix)
+            return digits
+        parts = []
+        for size, radix, table in plan:
+            value, chunk = divmod(value, radix)
+            parts.append(table[chunk * size:(chunk + 1) * size])
+        parts.reverse()
+        return list(b"".join(parts))
+    def _emoji_to_indices(self, emoji_str: str) -> List[int]:
+        """
+        Splits `emoji_str` into alphabet indices with one longest-match walk of
+        the code-point trie, so no grapheme segmentation is needed.
+        """
+        root, indices = self._emoji_trie, []
+        pos, end = 0, len(emoji_str)
+        while pos < end:
+            node, cursor, match = root, pos, None
+            while cursor < end:
+                node = node.get(emoji_str[cursor])
+                if node is None: break
+                cursor += 1
+                if _TRIE_END in node: match, matched_end = node[_TRIE_END], cursor
+            if match is None: raise UnknownEmojiError(emoji_str, pos)
+            indices.append(match)
+            pos = matched_end
+        return indices
+    def _decode_value(self, decimal_str: str, emoji_indices: List[int]) -> int:
+        # The decimal half is parsed in one int() call rather than digit by digit.
+        if decimal_str and not decimal_str.isdecimal():
+            raise ValueError(f"Decimal part must contain only digits, got '{decimal_str}'")
+        val = int(decimal_str) if decimal_str else 0
+        for index in emoji_indices: val = val * self.emoji_count + index
+        return val
+    def encode(self, data_bytes: bytes) -> Tuple[str, str]:
+        checksum_int = int.from_bytes(data_bytes, 'big')
+        if checksum_int > self.max_input_value: raise ValueError(f"Input {checksum_int} exceeds {self.input_bits}-bit range")
+        # The decimal half is rendered by int->str directly (it already converts
+        # in 10**9 chunks internally); only the emoji half needs the digit tables.
+        decimal_value, emoji_value = divmod(checksum_int, self.emoji_capacity)
+        decimal_str = str(decimal_value).zfill(self.half_N)
+        emoji_str = "".join([self._table[i] for i in self._digits(emoji_value, self._emoji_plan)])
+        return decimal_str, emoji_str
+    def decode(self, decimal_str: str, emoji_str: str) -> bytes:
+        checksum_int = self._decode_value(decimal_str, self._emoji_to_indices(emoji_str))
+        return checksum_int.to_bytes(self.record_size, 'big', signed=False)
+    def _decode_split(self, decimal_str: str, emoji_str: str) -> Tuple[bytes, List[int]]:
+        """decode() that also returns the emoji indices, from the same trie walk."""
+        indices = self._emoji_to_indices(emoji_str)
+        return self._decode_value(decimal_str, indices).to_bytes(self.record_size, 'big', signed=False), indices
+    def encode_many(self, data) -> List[Tuple[str, str]]:
+        """
+        Encodes many fixed-size records in one call. `data` is either a
+        contiguous bytes-like buffer of N x record_size bytes or an iterable
+        of record_size-byte items. Returns one (decimal_str, emoji_str) per record.
+        """
+        buf = self._as_record_buffer(data)
+        if not buf: return []
+        np = _get_numpy()
+        if np is None:
+            size = self.record_size
+            # The base method, so an instrumented encoder counts this as one encode_many call.
+            encode = _HybridBaseEncoder.encode
+            return [encode(self, buf[i:i + size]) for i in range(0, len(buf), size)]
+        return _np_encode_many(np, self, buf)
+    def decode_many(self, pairs) -> bytes:
+        """
+        Decodes an iterable of (decimal_str, emoji_str) pairs and returns the
+        records concatenated into one buffer, so that
+        decode_many(encode_many(buf)) == buf.
+        """
+        pairs = list(pairs)
+        if not pairs: return b""
+        decimal_strs, emoji_indices = [], []
+        for decimal_str, emoji_str in pairs:
+            indices = self._emoji_to_indices(emoji_str)
+            if len(decimal_str) != self.half_N or len(indices) != self.half_N:
+                raise ValueError(f"Expected {self.half_N} decimals and {self.half_N} emojis, got '{decimal_str}' | '{emoji_str}'")
+            decimal_strs.append(decimal_str)
+            emoji_indices.append(indices)
+        np = _get_numpy()
+        if np is None:
+            return b"".join(
+                self._decode_value(dec, emos).to_bytes(self.record_size, 'big', signed=False)
+                for dec, emos in zip(decimal_strs, emoji_indices)
+            )
+        return _np_decode_many(np, self, decimal_strs, emoji_indices)
+    def encode_stream(self, data) -> Iterator[Tuple[str, str]]:
+        """
+        Encodes an arbitrarily long byte string as consecutive record_size
+        blocks, yielding one (decimal_str, emoji_str) per block. `data` is a
+        bytes-like object, a binary file, or an iterable of bytes-like chunks
+        of any size. The last block is zero-padded at the end, so keep the
+        original length to pass to decode_stream. Blocks go through
+        encode_many in batches of STREAM_BATCH_RECORDS, so the cost is linear
+        in the input length and at most one batch of pairs is held at a time.
+        """
+        batch_bytes = self.record_size * STREAM_BATCH_RECORDS
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            chunks = [data]
+        elif hasattr(data, 'read'):
+            chunks = iter(lambda: data.read(batch_bytes), b"")
+        else:
+            chunks = data
+        pending = bytearray()
+        for chunk in chunks:
+            view = memoryview(chunk).cast('B')
+            # Whole batches are encoded straight from the chunk, so a large
+            # buffer is never copied or encoded in one go; only the tail of
+            # each chunk (less than a batch) is carried over in `pending`.
+            if pending:
+                take = min(batch_bytes - len(pending), len(view))
+                pending += view[:take]
+                view = view[take:]
+                if len(pending) < batch_bytes: continue
+                yield from self.encode_many(pending)
+                pending = bytearray()
+            while len(view) >= batch_bytes:
+                yield from self.encode_many(view[:batch_bytes])
+                view = view[batch_bytes:]
+            pending += view
+        if pending:
+            pending += bytes(-len(pending) % self.record_size)
+            yield from self.encode_many(pending)
+    def decode_stream(self, pairs, length: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Decodes (decimal_str, emoji_str) blocks produced by encode_stream,
+        yielding the bytes batch by batch. With `length`, output stops after
+        that many bytes, dropping the final block's padding.
+        """
+        remaining = length
+        iterator = iter(pairs)
+        while remaining is None or remaining > 0:
+            batch = list(itertools.islice(iterator, STREAM_BATCH_RECORDS))
+            if not batch: break
+            out = self.decode_many(batch)
+            if remaining is not None:
+                out = out[:remaining]
+                remaining -= len(out)
+            yield out
+    def _as_record_buffer(self, data) -> bytes:
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            buf = bytes(data)
+        else:
+            items = [bytes(item) for item in data]
+            if any(len(item) != self.record_size for item in items):
+                raise ValueError(f"Every record must be exactly {self.record_size} bytes.")
+            buf = b"".join(items)
+        if len(buf) % self.record_size:
+            raise ValueError(f"Buffer length {len(buf)} is not a multiple of {self.record_size}-byte records.")
+        return buf
+
+class _InstrumentedEncoder(_HybridBaseEncoder):
+    """
+    _HybridBaseEncoder that records per-base call latency, record counts and
+    errors (see metrics.py). Built instead of the plain class only while
+    metrics are enabled, so disabled metrics cost nothing per call.
+    """
+    def __init__(self, emoji_map: Union[Dict[str, str], Sequence[str]], input_bits: int = DEFAULT_INPUT_BITS):
+        super().__init__(emoji_map, input_bits)
+        registry = metrics.REGISTRY
+        self._metrics = {
+            op: (registry.histogram("doublebase_encoder_seconds", op=op, base=self.emoji_count),
+                 registry.counter("doublebase_encoder_records_total", op=op, base=self.emoji_count),
+                 registry.counter("doublebase_encoder_errors_total", op=op, base=self.emoji_count))
+            for op in ("encode", "decode", "encode_many", "decode_many")
+        }
+    def _timed(self, op: str, fn, records, *args):
+        histogram, record_counter, error_counter = self._metrics[op]
+        start = time.perf_counter()
+        try:
+            result = fn(self, *args)
+        except Exception:
+            error_counter.inc()
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - start)
+        record_counter.inc(records(result))
+        return result
+    def encode(self, data_bytes: bytes) -> Tuple[str, str]:
+        return self._timed("encode", _HybridBaseEncoder.encode, _one, data_bytes)
+    def decode(self, decimal_str: str, emoji_str: str) -> bytes:
+        return self._timed("decode", _HybridBaseEncoder.decode, _one, decimal_str, emoji_str)
+    def _decode_split(self, decimal_str: str, emoji_str: str) -> Tuple[bytes, List[int]]:
+        # Counted as a decode: CodecMemo decodes misses through this.
+        return self._timed("decode", _HybridBaseEncoder._decode_split, _one, decimal_str, emoji_str)
+    def encode_many(self, data) -> List[Tuple[str, str]]:
+        return self._timed("encode_many", _HybridBaseEncoder.encode_many, len, data)
+    def decode_many(self, pairs) -> bytes:
+        return self._timed("decode_many", _HybridBaseEncoder.decode_many,
+                           lambda buf: len(buf) // self.record_size, pairs)
+
+def _one(_result) -> int:
+    return 1
+
+# --- Shared encoder instances ---
+# Constructing an encoder (reverse map, trie, radix plan) costs milliseconds,
+# so encoders are cached per process, keyed by a fingerprint of the alphabet
+# (its index keys and emojis, in order) and the input width. Encoders are
+# read-only once built and safe to share between threads.
+# A second, identity-keyed layer makes repeated calls with the same emoji_map
+# object O(1); like the configs themselves, maps are treated as immutable.
+ENCODER_CACHE_SIZE = 32
+
+@functools.lru_cache(maxsize=ENCODER_CACHE_SIZE)
+def _shared_encoder(keys: Optional[Tuple[str, ...]], emojis: Sequence[str], input_bits: int) -> "_HybridBaseEncoder":
+    # keys is None when the alphabet was given as a plain sequence.
+    encoder_class = _InstrumentedEncoder if metrics.ENABLED else _HybridBaseEncoder
+    return encoder_class(dict(zip(keys, emojis)) if keys is not None else emojis, input_bits)
+
+# (id(emoji_map), input_bits) -> (emoji_map, encoder); holding the map keeps its id from being reused.
+_encoders_by_map_id = {}
+_encoders_by_map_id_lock = threading.Lock()
+
+def get_encoder(emoji_map: Union[Dict[str, str], Sequence[str]], input_bits: int = DEFAULT_INPUT_BITS) -> "_HybridBaseEncoder":
+    """Returns the process-wide encoder for this alphabet and width, building it on first use."""
+    map_key = (id(emoji_map), input_bits)
+    entry = _encoders_by_map_id.get(map_key)
+    if entry is not None and entry[0] is emoji_map:
+        return entry[1]
+    if isinstance(emoji_map, AlphabetView):
+        # Views are hashable, so they key the shared cache without being copied into it.
+        encoder = _shared_encoder(None, emoji_map, input_bits)
+    else:
+        keys = tuple(emoji_map) if isinstance(emoji_map, dict) else None
+        encoder = _shared_encoder(keys, tuple(emoji_map.values()) if keys is not None else tuple(emoji_map), input_bits)
+    with _encoders_by_map_id_lock:
+        if len(_encoders_by_map_id) >= ENCODER_CACHE_SIZE:
+            _encoders_by_map_id.pop(next(iter(_encoders_by_map_id)))
+        _encoders_by_map_id[map_key] = (emoji_map, encoder)
+    return encoder
+
+def encoder_for_config(config, input_bits: Optional[int] = None, caller: str = "dbaser") -> "_HybridBaseEncoder":
+    """
+    Returns the shared encoder for a config from cold_setup/warm_setup.
+    input_bits defaults to the config's "input_bits", else 128; `caller`
+    names the entry point in the error raised for an invalid config.
+    """
+    alphabet = config_alphabet(config)
+    if alphabet is None:
+        raise ValueError(f"Invalid configuration passed to {caller}. Expected a dict with 'emoji_map'.")
+    if input_bits is None: input_bits = config.get("input_bits", DEFAULT_INPUT_BITS)
+    return get_encoder(alphabet, input_bits)
+
+def clear_encoder_cache() -> None:
+    """Drops every shared encoder (e.g. after mutating an emoji_map in place)."""
+    with _encoders_by_map_id_lock:
+        _encoders_by_map_id.clear()
+    _shared_encoder.cache_clear()
+
+# --- Vectorized batch helpers (NumPy) ---
+# Each value is held as big-endian 32-bit limbs in uint64 lanes, so a limb
+# times a radix chunk (<= 2**32) plus a carry never overflows 64 bits.
+
+_LIMB_BITS = 32
+_LIMB_MASK = (1 << _LIMB_BITS) - 1
+
+def _radix_chunks(base: int, digits: int) -> List[int]:
+    """Splits `digits` base-`base` digits into runs whose radix fits in one limb."""
+    per_chunk = 1
+    # Capped at `digits`: for base 1 every power fits, so the loop would never end.
+    while per_chunk < digits and base ** (per_chunk + 1) <= 1 << _LIMB_BITS: per_chunk += 1
+    chunks = []
+    while digits > 0:
+        chunks.append(min(per_chunk, digits))
+        digits -= chunks[-1]
+    return chunks
+
+def _np_encode_many(np, encoder: "_HybridBaseEncoder", buf: bytes) -> List[Tuple[str, str]]:
+    count = len(buf) // encoder.record_size
+    raw = np.frombuffer(buf, dtype=np.uint8).reshape(count, encoder.record_size)
+    pad = -encoder.record_size % 4
+    if pad:
+        # Left-pad each record to whole 32-bit limbs; leading zeros keep the value.
+        raw = np.hstack([np.zeros((count, pad), dtype=np.uint8), raw])
+    limbs = np.ascontiguousarray(raw).view('>u4').astype(np.uint64)
+    shift = np.uint64(_LIMB_BITS)
+
+    def extract(base: int, out) -> None:
+        # Peels digits off the low end, right to left, one limb-sized chunk at a time.
+        pos = out.shape[1]
+        for chunk in _radix_chunks(base, out.shape[1]):
+            divisor = np.uint64(base ** chunk)
+            rem = np.zeros(count, dtype=np.uint64)
+            for j in range(limbs.shape[1]):
+                cur = (rem << shift) | limbs[:, j]
+                limbs[:, j] = cur // divisor
+                rem = cur % divisor
+            for _ in range(chunk):
+                pos -= 1
+                out[:, pos] = rem % np.uint64(base)
+                rem //= np.uint64(base)
+
+    emos = np.empty((count, encoder.half_N), dtype=np.uint64)
+    decs = np.empty((count, encoder.half_N), dtype=np.uint8)
+    extract(encoder.emoji_count, emos)
+    extract(encoder.decimal_base, decs)
+    half_N = encoder.half_N
+    all_decimals = (decs + ord('0')).tobytes().decode('ascii')
+    table = encoder._table
+    return [
+        (all_decimals[i * half_N:(i + 1) * half_N], "".join([table[k] for k in row]))
+        for i, row in enumerate(emos.tolist())
+    ]
+
+def _np_decode_many(np, encoder: "_HybridBaseEncoder", decimal_strs: List[str], emoji_indices: List[List[int]]) -> bytes:
+    count = len(decimal_strs)
+    try:
+        decs = np.frombuffer("".join(decimal_strs).encode('ascii'), dtype=np.uint8).reshape(count, -1) - ord('0')
+    except UnicodeEncodeError:
+        raise ValueError("Decimal part must contain only the digits 0-9.")
+    if (decs > 9).any(): raise ValueError("Decimal part must contain only the digits 0-9.")
+    emos = np.array(emoji_indices, dtype=np.uint64).reshape(count, -1)
+    capacity_bits = (encoder.decimal_base ** encoder.half_N * encoder.emoji_count ** encoder.half_N - 1).bit_length()
+    limbs = np.zeros((count, -(-capacity_bits // _LIMB_BITS)), dtype=np.uint64)
+    shift, mask = np.uint64(_LIMB_BITS), np.uint64(_LIMB_MASK)
+
+    def accumulate(base: int, digits) -> None:
+        # Horner's rule, one limb-sized chunk of digits per multi-limb multiply-add.
+        pos = 0
+        for chunk in _radix_chunks(base, digits.shape[1]):
+            carry = np.zeros(count, dtype=np.uint64)
+            for _ in range(chunk):
+                carry = carry * np.uint64(base) + digits[:, pos].astype(np.uint64)
+                pos += 1
+            multiplier = np.uint64(base ** chunk)
+            for j in range(limbs.shape[1] - 1, -1, -1):
+                cur = limbs[:, j] * multiplier + carry
+                limbs[:, j] = cur & mask
+                carry = cur >> shift
+
+    accumulate(encoder.decimal_base, decs)
+    accumulate(encoder.emoji_count, emos)
+    out_limbs = -(-encoder.record_size // 4)
+    pad = out_limbs * 4 - encoder.record_size
+    raw = limbs[:, limbs.shape[1] - out_limbs:].astype('>u4').view(np.uint8).reshape(count, -1)
+    if limbs[:, :limbs.shape[1] - out_limbs].any() or raw[:, :pad].any():
+        raise OverflowError(f"Decoded value exceeds {encoder.input_bits}-bit range")
+    return raw[:, pad:].tobytes()
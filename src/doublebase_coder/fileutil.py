@@ -0,0 +1,94 @@
+#fileutil.py
+# File helpers for cache files shared by many processes:
+#    atomic_write - write to a temp file in the same directory, fsync, then
+#                   os.replace over the target, so readers only ever see the
+#                   old file or the complete new one.
+#    FileLock     - an exclusive advisory lock on a side file (fcntl.flock on
+#                   POSIX, msvcrt.locking on Windows), used to make cache
+#                   fills single-flight across processes.
+import contextlib
+import os
+import stat
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Permissions for newly created files (mkstemp would otherwise leave them 0600).
+DEFAULT_FILE_MODE = 0o644
+
+@contextlib.contextmanager
+def atomic_write(path: str, mode: str = 'w', encoding: str = None):
+    """
+    Context manager yielding a file object; on a clean exit its contents
+    replace `path` atomically. On error the temp file is removed and `path`
+    is left untouched.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        try:
+            file_mode = stat.S_IMODE(os.stat(path).st_mode)
+        except OSError:
+            file_mode = DEFAULT_FILE_MODE
+        os.chmod(tmp_path, file_mode)
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+class FileLock:
+    """
+    Exclusive inter-process lock held on `path` (created if missing and left
+    in place afterwards). Each FileLock opens its own descriptor, so two
+    instances contend even within one process.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Takes the lock; with blocking=False returns False instead of waiting."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, DEFAULT_FILE_MODE)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            if blocking: raise
+            return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None: return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    @property
+    def locked(self) -> bool:
+        return self._fd is not None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
@@ -0,0 +1,89 @@
+#memo.py
+# Bounded LRU memoization for dbaser encode/decode pairs, for workloads that
+# see the same checksums over and over. One CodecMemo serves both directions
+# of a pair: every encode also records the reverse (pair -> record) entry,
+# and every decode of a canonical pair records the forward one, so a record
+# decoded once is not re-encoded from scratch, and vice versa.
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+from .encoder import _HybridBaseEncoder
+
+class CodecMemo:
+    """
+    Thread-safe LRU caches of encode and decode results for one encoder,
+    each holding at most max_entries entries (least recently used evicted
+    first). Exceptions are never cached. info() reports hits, misses and
+    evictions per direction.
+    """
+    def __init__(self, encoder: _HybridBaseEncoder, max_entries: int):
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be positive, got {max_entries}.")
+        self.encoder = encoder
+        self.max_entries = max_entries
+        self._encoded = OrderedDict()  # record bytes -> (decimal_str, emoji_str)
+        self._decoded = OrderedDict()  # (decimal_str, emoji_str) -> record bytes
+        self._stats = {"encode": [0, 0, 0], "decode": [0, 0, 0]}  # hits, misses, evictions
+        self._lock = threading.Lock()
+
+    def encode(self, data_bytes: bytes) -> Tuple[str, str]:
+        key = data_bytes if type(data_bytes) is bytes else bytes(data_bytes)
+        with self._lock:
+            pair = self._encoded.get(key)
+            if pair is not None:
+                self._encoded.move_to_end(key)
+                self._stats["encode"][0] += 1
+                return pair
+            self._stats["encode"][1] += 1
+        pair = self.encoder.encode(key)
+        size = self.encoder.record_size
+        # decode always returns record_size bytes, even for a shorter input.
+        record = key if len(key) == size else int.from_bytes(key, 'big').to_bytes(size, 'big')
+        with self._lock:
+            self._put("encode", self._encoded, key, pair)
+            self._put("decode", self._decoded, pair, record)
+        return pair
+
+    def decode(self, decimal_str: str, emoji_str: str) -> bytes:
+        key = (decimal_str, emoji_str)
+        with self._lock:
+            record = self._decoded.get(key)
+            if record is not None:
+                self._decoded.move_to_end(key)
+                self._stats["decode"][0] += 1
+                return record
+            self._stats["decode"][1] += 1
+        encoder = self.encoder
+        # One trie walk yields both the record and the emoji count.
+        record, indices = encoder._decode_split(decimal_str, emoji_str)
+        # Only the canonical spelling (what encode returns) may seed the encode cache.
+        canonical = len(decimal_str) == encoder.half_N == len(indices) and decimal_str.isascii()
+        with self._lock:
+            self._put("decode", self._decoded, key, record)
+            if canonical:
+                self._put("encode", self._encoded, record, key)
+        return record
+
+    def _put(self, direction: str, table: OrderedDict, key, value) -> None:
+        table[key] = value
+        table.move_to_end(key)
+        if len(table) > self.max_entries:
+            table.popitem(last=False)
+            self._stats[direction][2] += 1
+
+    def info(self) -> dict:
+        """{"encode": {...}, "decode": {...}} with hits, misses, evictions and entries, plus max_entries."""
+        with self._lock:
+            info = {direction: {"hits": hits, "misses": misses, "evictions": evictions,
+                                "entries": len(self._encoded if direction == "encode" else self._decoded)}
+                    for direction, (hits, misses, evictions) in self._stats.items()}
+        info["max_entries"] = self.max_entries
+        return info
+
+    def clear(self) -> None:
+        """Drops every cached result and resets the statistics."""
+        with self._lock:
+            self._encoded.clear()
+            self._decoded.clear()
+            self._stats = {"encode": [0, 0, 0], "decode": [0, 0, 0]}
@@ -0,0 +1,180 @@
+#metrics.py
+# Opt-in, dependency-free instrumentation.
+#
+# Metrics are off unless DOUBLEBASE_METRICS is set (to anything but "" or "0")
+# or enable() is called. While off, encoders are plain _HybridBaseEncoder
+# instances and span() returns a shared no-op context manager, so the hot
+# paths pay nothing. While on:
+#    doublebase_encoder_seconds{op,base}          histogram per encode/decode(_many) call
+#    doublebase_encoder_records_total{op,base}    records processed
+#    doublebase_encoder_errors_total{op,base}     calls that raised
+#    doublebase_cold_setup_seconds{phase}         cold_setup phases (see providers.py)
+#    doublebase_http_requests_total{path,method,status} and
+#    doublebase_http_request_seconds{path}        API server requests
+# render() returns everything in the Prometheus text format (served at /metrics).
+# Metrics are per process: each uvicorn worker keeps its own.
+import bisect
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Tuple
+
+METRICS_ENV = "DOUBLEBASE_METRICS"
+ENABLED = os.environ.get(METRICS_ENV, "") not in ("", "0")
+
+# Latency buckets in seconds: single encodes take microseconds, cold setups seconds.
+DEFAULT_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Counter:
+    """A monotonically increasing count."""
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+class Histogram:
+    """Counts observations into fixed upper-bound buckets, plus their count and sum."""
+    __slots__ = ("buckets", "bucket_counts", "count", "sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Returns [(upper_bound, observations <= upper_bound), ...] ending with +Inf."""
+        total, rows = 0, []
+        for bound, count in zip(self.buckets + (float("inf"),), self.bucket_counts):
+            total += count
+            rows.append((bound, total))
+        return rows
+
+class MetricsRegistry:
+    """Named metrics, one instance per distinct label set."""
+    def __init__(self):
+        self._kinds: Dict[str, str] = {}
+        self._metrics: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], object] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind: str, factory, name: str, labels: Dict[str, object]):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                if self._kinds.setdefault(name, kind) != kind:
+                    raise ValueError(f"Metric '{name}' is already registered as a {self._kinds[name]}.")
+                metric = self._metrics.setdefault(key, factory())
+        return metric
+
+    def counter(self, name: str, **labels) -> Counter:
+        return self._get("counter", Counter, name, labels)
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        return self._get("histogram", Histogram, name, labels)
+
+    def collect(self) -> Iterator[Tuple[str, str, Dict[str, str], object]]:
+        """Yields (name, kind, labels, metric), grouped by name."""
+        with self._lock:
+            items = sorted(self._metrics.items(), key=lambda item: item[0])
+        for (name, labels), metric in items:
+            yield name, self._kinds[name], dict(labels), metric
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        lines, last_name = [], None
+        for name, kind, labels, metric in self.collect():
+            if name != last_name:
+                lines.append(f"# TYPE {name} {kind}")
+                last_name = name
+            if kind == "counter":
+                lines.append(f"{name}{_format_labels(labels)} {metric.value}")
+                continue
+            for bound, count in metric.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': le})} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {metric.sum!r}")
+            lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._kinds.clear()
+            self._metrics.clear()
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels: return ""
+    escape = lambda value: value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+REGISTRY = MetricsRegistry()
+
+def enable() -> None:
+    """
+    Turns metrics on. Encoders built from now on are instrumented; the shared
+    encoder cache is cleared, so call this before creating dbaser pairs.
+    """
+    _set_enabled(True)
+
+def disable() -> None:
+    """Turns metrics off for newly built encoders and spans; recorded values are kept."""
+    _set_enabled(False)
+
+def _set_enabled(enabled: bool) -> None:
+    global ENABLED
+    if ENABLED == enabled: return
+    ENABLED = enabled
+    from .encoder import clear_encoder_cache
+    clear_encoder_cache()
+
+def render() -> str:
+    """The process's metrics in the Prometheus text format."""
+    return REGISTRY.render()
+
+class _Span:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._start)
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+def span(name: str, **labels):
+    """
+    Context manager timing its block into the doublebase_<name>_seconds
+    histogram, e.g. `with span("cold_setup", phase="fetch"):`. A shared
+    no-op while metrics are disabled.
+    """
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(REGISTRY.histogram(f"doublebase_{name}_seconds", **labels))
@@ -0,0 +1,80 @@
+#parallel.py
+# Multi-core encoding of large files of packed fixed-size records (16 bytes by default).
+#
+# The input file is memory-mapped and split into shards by byte offset. Each
+# worker process builds one _HybridBaseEncoder from the (pickled) alphabet in
+# a config produced by cold_setup/warm_setup, maps the file itself, and
+# returns its shard already rendered as '<decimal> | <emoji>' lines when
+# writing to a file, or as the list of pairs otherwise. The parent collects
+# shards in input order.
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from .encoder import _HybridBaseEncoder, encoder_for_config
+
+# Records per shard handed to a worker.
+DEFAULT_SHARD_RECORDS = 65536
+
+# Per-process state, set up once by _init_worker.
+_worker_encoder = None
+_worker_mm = None
+
+def _init_worker(emoji_list: tuple, input_path: str, input_bits: int) -> None:
+    global _worker_encoder, _worker_mm
+    _worker_encoder = _HybridBaseEncoder(emoji_list, input_bits)
+    with open(input_path, 'rb') as f:
+        _worker_mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _encode_shard(offset: int, length: int, render: bool):
+    pairs = _worker_encoder.encode_many(_worker_mm[offset:offset + length])
+    return "".join([f"{dec} | {emo}\n" for dec, emo in pairs]) if render else pairs
+
+def shard_offsets(total_bytes: int, record_size: int, shard_records: int) -> List[Tuple[int, int]]:
+    """Splits a file of `total_bytes` into (offset, length) shards on record boundaries."""
+    if total_bytes % record_size:
+        raise ValueError(f"File size {total_bytes} is not a multiple of {record_size}-byte records.")
+    step = record_size * shard_records
+    return [(offset, min(step, total_bytes - offset)) for offset in range(0, total_bytes, step)]
+
+def encode_file_parallel(config: dict, input_path: str, output_path: Optional[str] = None,
+                         workers: Optional[int] = None, shard_records: int = DEFAULT_SHARD_RECORDS,
+                         input_bits: Optional[int] = None):
+    """
+    Encodes every record (input_bits / 8 bytes; default 16) in `input_path` using `workers` processes
+    (default: os.cpu_count()). If `output_path` is given, writes one
+    '<decimal> | <emoji>' line per record in input order and returns the
+    record count; otherwise returns the list of (decimal_str, emoji_str) pairs.
+    """
+    encoder = encoder_for_config(config, input_bits, "encode_file_parallel")
+    # Workers receive the compact tuple form of the alphabet.
+    emoji_list, input_bits, record_size = encoder.emoji_list, encoder.input_bits, encoder.record_size
+    shards = shard_offsets(os.path.getsize(input_path), record_size, shard_records)
+    workers = workers or os.cpu_count() or 1
+
+    out = open(output_path, 'w', encoding='utf-8', newline='\n') if output_path else None
+    render = out is not None
+    pairs = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(emoji_list, input_path, input_bits)) as executor:
+            # Keep a bounded window of shards in flight so memory stays flat on huge inputs.
+            pending = deque()
+            shard_iter = iter(shards)
+            for shard in shard_iter:
+                pending.append(executor.submit(_encode_shard, *shard, render))
+                if len(pending) >= 2 * workers: break
+            while pending:
+                result = pending.popleft().result()
+                next_shard = next(shard_iter, None)
+                if next_shard is not None:
+                    pending.append(executor.submit(_encode_shard, *next_shard, render))
+                if out:
+                    out.write(result)
+                else:
+                    pairs.extend(result)
+    finally:
+        if out: out.close()
+    return sum(length for _, length in shards) // record_size if out else pairs
@@ -0,0 +1,139 @@
+#prefix_cache.py
+# Deduplicated JSON cache layout.
+#
+# The server sorts each emoji-set combination once and every base is a prefix
+# of that order, so the per-base layout ({"256": {"emoji_map": ...}, "1024":
+# {"emoji_map": ...}}) mostly repeats the same strings. This layout stores each
+# distinct ordered alphabet once, plus a (alphabet, length) cut per base:
+#
+#    {
+#      "format": "doublebase-prefix-cache",
+#      "version": 1,
+#      "alphabets": [["😀", "😁", ...]],
+#      "bases": {"256": [0, 256], "1024": [0, 1024]}
+#    }
+#
+# PrefixCache reads it back in the familiar cache["256"] shape; each base's
+# "emoji_list" is an AlphabetView over the shared alphabet, which dbaser uses
+# without copying. "emoji_map" is still available and is built on access.
+import json
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+
+from .encoder import AlphabetView, _as_emoji_tuple, config_alphabet
+from .fileutil import atomic_write
+
+PREFIX_FORMAT = "doublebase-prefix-cache"
+PREFIX_FORMAT_VERSION = 1
+
+def is_prefix_document(document) -> bool:
+    """Returns True if a parsed JSON cache uses the prefix-sharing layout."""
+    return isinstance(document, dict) and document.get("format") == PREFIX_FORMAT
+
+class PrefixConfig(Mapping):
+    """One base of a PrefixCache: {"emoji_count", "emoji_map"}, plus "emoji_list" as a view."""
+    _KEYS = ("emoji_count", "emoji_map")
+
+    def __init__(self, view: AlphabetView):
+        self._view = view
+        self._emoji_map = None
+
+    def __getitem__(self, key: str):
+        if key == "emoji_list":
+            return self._view
+        if key == "emoji_count":
+            return len(self._view)
+        if key == "emoji_map":
+            if self._emoji_map is None:
+                self._emoji_map = {str(i): emoji for i, emoji in enumerate(self._view)}
+            return self._emoji_map
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        # Overridden so membership tests never build emoji_map.
+        return key == "emoji_list" or key in self._KEYS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+class PrefixCache(Mapping):
+    """Read-only view of a prefix-sharing cache document, keyed by base like the JSON cache."""
+    def __init__(self, document: dict):
+        if not is_prefix_document(document):
+            raise ValueError("Not a prefix-sharing cache document.")
+        if document.get("version") != PREFIX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported prefix cache version {document.get('version')}.")
+        self.alphabets = [tuple(alphabet) for alphabet in document["alphabets"]]
+        self._configs = {}
+        for key, (alphabet_index, length) in document["bases"].items():
+            self._configs[key] = PrefixConfig(AlphabetView(self.alphabets[alphabet_index], length))
+
+    def __getitem__(self, key: str) -> PrefixConfig:
+        return self._configs[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._configs)
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+def build_prefix_document(configs: Mapping) -> dict:
+    """
+    Builds the prefix-sharing document for `configs` (any cache shape, keyed
+    by base). Bases whose alphabets are prefixes of one another share one
+    stored alphabet; unrelated alphabets (other emoji sets) are stored separately.
+    """
+    entries = []
+    for key in configs:
+        alphabet = config_alphabet(configs[key])
+        if alphabet is None:
+            raise ValueError(f"Cache entry '{key}' has no 'emoji_map'.")
+        entries.append((str(key), list(_as_emoji_tuple(alphabet))))
+
+    alphabets: List[List[str]] = []
+    bases: Dict[str, List[int]] = {}
+    # Longest first, so each shorter alphabet can find the list it is a prefix of.
+    for key, emojis in sorted(entries, key=lambda entry: len(entry[1]), reverse=True):
+        for index, alphabet in enumerate(alphabets):
+            if alphabet[:len(emojis)] == emojis:
+                bases[key] = [index, len(emojis)]
+                break
+        else:
+            alphabets.append(emojis)
+            bases[key] = [len(alphabets) - 1, len(emojis)]
+
+    # (length, text) orders base keys numerically.
+    ordered_bases = dict(sorted(bases.items(), key=lambda item: (len(item[0]), item[0])))
+    return {"format": PREFIX_FORMAT, "version": PREFIX_FORMAT_VERSION, "alphabets": alphabets, "bases": ordered_bases}
+
+def write_prefix_cache(configs: Mapping, path: str) -> PrefixCache:
+    """
+    Writes `configs` to `path` (atomically) in the prefix-sharing layout and
+    returns it as a PrefixCache.
+    """
+    document = build_prefix_document(configs)
+    with atomic_write(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+    return PrefixCache(document)
+
+def migrate_cache(source_path: str, target_path: Optional[str] = None) -> PrefixCache:
+    """
+    Rewrites a per-base JSON cache (or a binary cache) at `source_path` in the
+    prefix-sharing layout, in place unless `target_path` is given.
+    """
+    from .binary_cache import BinaryCache, is_binary_cache
+    if is_binary_cache(source_path):
+        cache = BinaryCache(source_path)
+        try:
+            configs = {key: {"emoji_list": cache.emoji_list(key)} for key in cache}
+        finally:
+            cache.close()
+    else:
+        with open(source_path, 'r', encoding='utf-8') as f:
+            configs = json.load(f)
+        if is_prefix_document(configs):
+            configs = PrefixCache(configs)
+    return write_prefix_cache(configs, target_path or source_path)
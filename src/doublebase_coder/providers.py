@@ -0,0 +1,292 @@
+#providers.py
+# Alphabet providers and cold_setup. This is the only part of the library that
+# needs asyncio or subprocess; doublebase_lib imports it lazily on the first
+# access to cold_setup or a provider class. httpx is imported only once an
+# HttpProvider actually fetches.
+import abc
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import logging
+import uuid
+from typing import List, Dict, Optional
+
+from .api_utils import EMOJI_DATA_PATH, SERVER_READY_PREFIX, find_latest_api_url, order_emoji_sets, post_json
+from .binary_cache import BinaryCache, write_binary_cache
+from .prefix_cache import write_prefix_cache
+from .scraper import SNAPSHOT_PATH, load_emoji_snapshot
+from .doublebase_lib import warm_setup
+from .fileutil import FileLock
+from .metrics import span
+
+# ==============================================================================
+# SECTION 1: ALPHABET PROVIDERS
+# ==============================================================================
+
+DEFAULT_SETS = ["core", "extended"]
+
+# Seconds to wait for a temporary server (which may first need to scrape) to report ready.
+SERVER_START_TIMEOUT = 15.0
+
+class AlphabetProvider(abc.ABC):
+    """
+    Source of emoji maps for cold_setup. Subclasses implement fetch_maps,
+    returning {base: {"0": emoji, "1": emoji, ...}} for every requested base.
+    """
+    def __init__(self, sets: Optional[List[str]] = None):
+        self.sets = list(sets) if sets else list(DEFAULT_SETS)
+
+    @abc.abstractmethod
+    async def fetch_maps(self, bases: List[int]) -> Dict[int, Dict[str, str]]:
+        """Returns {base: emoji_map} for every base in `bases`."""
+
+class InProcessProvider(AlphabetProvider):
+    """
+    Builds emoji maps directly from emoji_data.json (or, when it has not
+    been generated, the bundled snapshot, as the API server does), with the
+    same ordering as its /api/v1/ordered-set endpoint. No server, no network.
+    """
+    def __init__(self, sets: Optional[List[str]] = None, emoji_data_path: str = EMOJI_DATA_PATH):
+        super().__init__(sets)
+        self.emoji_data_path = emoji_data_path
+        self._ordered = None
+
+    def ordered_emojis(self) -> List[str]:
+        """Loads the emoji data once and returns the server-ordered list for `self.sets`."""
+        if self._ordered is None:
+            if os.path.exists(self.emoji_data_path):
+                with open(self.emoji_data_path, 'r', encoding='utf-8') as f:
+                    emoji_data = json.load(f)
+            else:
+                _, emoji_data = load_emoji_snapshot()
+            self._ordered = order_emoji_sets(emoji_data, self.sets)
+        return self._ordered
+
+    async def fetch_maps(self, bases: List[int]) -> Dict[int, Dict[str, str]]:
+        ordered = self.ordered_emojis()
+        return {base: {str(i): emoji for i, emoji in enumerate(ordered[:base])} for base in bases}
+
+def ordered_sets_url(api_url: str) -> str:
+    """Maps an .../api/v1/ordered-set URL to the multi-base .../api/v1/ordered-sets endpoint."""
+    return api_url.rstrip("/").rsplit("/", 1)[0] + "/ordered-sets"
+
+class HttpProvider(AlphabetProvider):
+    """
+    Fetches emoji maps from the ordered-set API. Uses `api_url` if given,
+    otherwise the server found in api.log, starting a temporary one if needed.
+    Requests go through the shared pooled client (api_utils.get_http_client).
+    """
+    def __init__(self, sets: Optional[List[str]] = None, api_url: Optional[str] = None):
+        super().__init__(sets)
+        self.api_url = api_url
+
+    async def _get_map_async(self, api_url: str, count: int) -> Dict[str, str]:
+        """Helper coroutine to fetch one emoji map."""
+        return await post_json(api_url, {"ordered_set_count": count, "sets": self.sets})
+
+    async def _get_maps_async(self, api_url: str, bases: List[int]) -> Dict[int, Dict[str, str]]:
+        """
+        Fetches every base in one round trip from /api/v1/ordered-sets, which
+        sends the longest ordered list once plus a cut point per base. Servers
+        without that endpoint get a single /api/v1/ordered-set request for
+        the largest base instead; the smaller bases are its prefixes.
+        """
+        import httpx
+        try:
+            reply = await post_json(ordered_sets_url(api_url), {"counts": list(bases), "sets": self.sets})
+            emojis, cuts = reply["emojis"], reply["cuts"]
+            return {base: {str(i): emoji for i, emoji in enumerate(emojis[:cuts[str(base)]])} for base in bases}
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in (404, 405): raise
+        full_map = await self._get_map_async(api_url, max(bases))
+        return {base: {str(i): full_map[str(i)] for i in range(min(base, len(full_map)))} for base in bases}
+
+    async def fetch_maps(self, bases: List[int]) -> Dict[int, Dict[str, str]]:
+        import httpx
+        api_process = None
+        final_api_url = self.api_url
+
+        with span("cold_setup", phase="discovery"):
+            candidate_url = find_latest_api_url() if final_api_url is None else None
+        if candidate_url:
+            print(f"  Found candidate server: {candidate_url}")
+            print("  Verifying if it's responsive...")
+            try:
+                with span("cold_setup", phase="probe"):
+                    try:
+                        await post_json(candidate_url, {"ordered_set_count": 1, "sets": ["core"]}, timeout=2.0, retries=0)
+                    except httpx.HTTPStatusError:
+                        pass  # any HTTP response means the server is up
+                final_api_url = candidate_url
+                print("  Verification successful. Using existing server.")
+            # --- Start of Local Change ---
+            # The exception list is expanded to include the specific timeout error.
+            except (httpx.ConnectError, httpx.ReadTimeout, httpx.ConnectTimeout):
+            # --- End of Local Change ---
+                print("  Verification failed. Server is not running at that address (stale discovery file or log).")
+
+        if final_api_url is None:
+            print("  No active API server found or verified. Starting a temporary one...")
+            try:
+                with span("cold_setup", phase="server_spawn"):
+                    api_process, final_api_url = await _start_temporary_server()
+                print(f"  Temporary server started and located at: {final_api_url}")
+            except Exception:
+                logging.error("Failed to start and manage temporary API server.", exc_info=True)
+                raise
+
+        try:
+            return await self._get_maps_async(final_api_url, bases)
+        finally:
+            if api_process:
+                print("  Shutting down temporary API server...")
+                api_process.terminate()
+                try:
+                    await asyncio.wait_for(api_process.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    api_process.kill()
+
+async def _start_temporary_server():
+    """
+    Spawns `cli server --ready-stdout` and waits for its readiness line
+    instead of polling for the URL. Returns (process, api_url).
+    """
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "doublebase_coder.cli", "server", "--ready-stdout",
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError("Temporary API server started but did not report ready in time.")
+            line = await asyncio.wait_for(process.stdout.readline(), timeout=remaining)
+            if not line:
+                raise RuntimeError(f"Temporary API server exited before it was ready (code {await process.wait()}).")
+            text = line.decode('utf-8', errors='replace').strip()
+            if text.startswith(SERVER_READY_PREFIX + " "):
+                return process, text[len(SERVER_READY_PREFIX) + 1:]
+    except BaseException:
+        if process.returncode is None: process.kill()
+        raise
+
+def default_provider() -> AlphabetProvider:
+    """In-process when emoji_data.json or the bundled snapshot is available locally, otherwise the HTTP API."""
+    if os.path.exists(EMOJI_DATA_PATH) or os.path.exists(SNAPSHOT_PATH):
+        return InProcessProvider()
+    return HttpProvider()
+
+# ==============================================================================
+# SECTION 2: COLD SETUP
+# ==============================================================================
+
+# Cache fills are serialized across processes with a lock file next to the
+# cache; waiters poll for it every CACHE_LOCK_POLL seconds.
+CACHE_LOCK_SUFFIX = ".lock"
+CACHE_LOCK_TIMEOUT = 120.0
+CACHE_LOCK_POLL = 0.05
+
+async def cold_setup(bases: List[int], cache_path: Optional[str] = None,
+                     provider: Optional[AlphabetProvider] = None) -> Optional[dict]:
+    """
+    Establishes and persists emoji mappings. Manages its own dependencies.
+    Mappings come from `provider`; by default they are built in-process from
+    the local emoji data, falling back to the HTTP API when it is missing.
+
+    Safe for many processes sharing one cache file: fills are single-flight
+    behind a lock file, and the cache is replaced atomically.
+
+    With metrics enabled, each phase (cache_read, lock_wait, fetch,
+    cache_write, and HttpProvider's discovery, probe and server_spawn) is
+    timed into doublebase_cold_setup_seconds{phase=...}.
+    """
+    print("--- Running Cold Setup ---")
+    
+    is_default_path = False
+    if cache_path:
+        target_cache_path = cache_path
+    else:
+        is_default_path = True
+        default_filename = f"dbase_cache_{uuid.uuid4().hex[:8]}.json"
+        target_cache_path = os.path.join(os.getcwd(), default_filename)
+        print(f"  No cache_path provided. Using default safety-net path: {target_cache_path}")
+
+    with span("cold_setup", phase="cache_read"):
+        existing_configs = _read_cache(target_cache_path)
+    bases_to_fetch = [b for b in bases if str(b) not in existing_configs]
+    if not bases_to_fetch:
+        print("  All requested bases are already present in the cache. No API call needed.")
+        return existing_configs
+
+    # Single-flight: one process fills the cache while the others wait on the
+    # lock, then re-read the cache and usually find nothing left to fetch.
+    lock = FileLock(target_cache_path + CACHE_LOCK_SUFFIX)
+    with span("cold_setup", phase="lock_wait"):
+        acquired = await _acquire_cache_lock(lock)
+    if not acquired:
+        logging.warning(f"Could not lock '{target_cache_path}' within {CACHE_LOCK_TIMEOUT}s; continuing without the lock.")
+    try:
+        if lock.locked:
+            if isinstance(existing_configs, BinaryCache): existing_configs.close()
+            with span("cold_setup", phase="cache_read"):
+                existing_configs = _read_cache(target_cache_path)
+            bases_to_fetch = [b for b in bases if str(b) not in existing_configs]
+            if not bases_to_fetch:
+                print("  Another process filled the cache while we waited. No API call needed.")
+                return existing_configs
+        return await _fill_cache(existing_configs, bases_to_fetch, target_cache_path, provider, is_default_path)
+    finally:
+        lock.release()
+
+def _read_cache(cache_path: str):
+    configs = warm_setup(cache_path) if os.path.exists(cache_path) else {}
+    return {} if configs is None else configs
+
+async def _acquire_cache_lock(lock: FileLock, timeout: float = None) -> bool:
+    """Polls for the lock without blocking the event loop; False on timeout or if it cannot be created."""
+    deadline = time.monotonic() + (CACHE_LOCK_TIMEOUT if timeout is None else timeout)
+    try:
+        while not lock.acquire(blocking=False):
+            if time.monotonic() >= deadline: return False
+            await asyncio.sleep(CACHE_LOCK_POLL)
+    except OSError:
+        logging.warning(f"Could not create lock file '{lock.path}'.", exc_info=True)
+        return False
+    return True
+
+async def _fill_cache(existing_configs, bases_to_fetch: List[int], target_cache_path: str,
+                      provider: Optional[AlphabetProvider], is_default_path: bool):
+    if provider is None: provider = default_provider()
+    print(f"  Cache is missing mappings for bases: {bases_to_fetch}. Querying {type(provider).__name__}.")
+
+    try:
+        newly_fetched_configs = {}
+        with span("cold_setup", phase="fetch"):
+            fetched = await provider.fetch_maps(bases_to_fetch)
+        for base in bases_to_fetch:
+            emoji_map = fetched[base]
+            newly_fetched_configs[str(base)] = {"emoji_count": len(emoji_map), "emoji_map": emoji_map}
+        
+        final_configs = {**existing_configs, **newly_fetched_configs}
+        with span("cold_setup", phase="cache_write"):
+            if isinstance(existing_configs, BinaryCache):
+                # Keep a binary cache binary; the old mapping must be released before overwriting.
+                existing_configs.close()
+                write_binary_cache(final_configs, target_cache_path)
+            else:
+                # JSON caches are (re)written in the prefix-sharing layout; older
+                # per-base caches are migrated the first time a base is added.
+                final_configs = write_prefix_cache(final_configs, target_cache_path)
+        print(f"--- Configuration successfully saved to '{target_cache_path}' ---")
+
+        if is_default_path:
+            print("\n  [RECOMMENDATION] To reuse this mapping, pass its path in future calls:")
+            print(f"  > warm_setup(cache_path='{os.path.abspath(target_cache_path)}')")
+        return final_configs
+    except Exception:
+        logging.error("Failed to fetch emoji maps and build cache.", exc_info=True)
+        return None
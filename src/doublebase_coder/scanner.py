@@ -0,0 +1,122 @@
+#scanner.py
+# Finds and decodes '<decimal> | <emoji>' tokens embedded in arbitrary text
+# (logs, tickets, corpora) in one linear pass with bounded memory.
+#
+# A regex finds each run of exactly half_N ASCII digits followed by the
+# separator; from there the encoder's code-point trie reads exactly half_N
+# alphabet emojis (longest match, so no grapheme segmentation is needed).
+# Text is consumed in chunks, and only a tail as long as the longest
+# possible token is carried over between chunks, so multi-GB files stream in
+# constant memory. Offsets are character offsets into the whole stream.
+import re
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from .encoder import _TRIE_END, encoder_for_config
+
+DEFAULT_SEPARATOR = " | "
+# Characters read from a file (or gathered from an iterable) per scanning step.
+SCAN_CHUNK_CHARS = 1 << 20
+
+class TokenScanner:
+    """
+    Scans text for doublebase tokens of one config and decodes them.
+
+    scan() yields (start, end, data) for each token, where text[start:end]
+    is the token and data its decoded record_size bytes. A token must have
+    exactly half_N digits (not preceded by another digit), the separator,
+    and exactly half_N emojis of this alphabet not followed by another one.
+    Digit runs that decode out of range are skipped, not raised.
+    """
+    def __init__(self, config: dict, input_bits: Optional[int] = None, separator: str = DEFAULT_SEPARATOR):
+        self.encoder = encoder_for_config(config, input_bits, "TokenScanner")
+        self.separator = separator
+        self._pattern = re.compile(r"(?<![0-9])[0-9]{%d}%s" % (self.encoder.half_N, re.escape(separator)))
+        longest_emoji = max(len(emoji) for emoji in self.encoder.emoji_list)
+        # Characters past a token's start needed to decide it, including the
+        # look at the emoji after it.
+        self.max_token_chars = self.encoder.half_N * (1 + longest_emoji) + len(separator) + longest_emoji
+
+    def scan(self, source: Union[str, Iterable[str]]) -> Iterator[Tuple[int, int, bytes]]:
+        """
+        Yields (start, end, data) for every token in `source`: a str, a text
+        file object (read in chunks), or an iterable of str chunks or lines.
+        """
+        buf, buf_offset, pos = "", 0, 0
+        for chunk in _text_chunks(source):
+            buf += chunk
+            # Tokens starting before `limit` are fully inside the buffer.
+            limit = len(buf) - self.max_token_chars
+            if limit <= pos: continue
+            pos = yield from self._scan_buffer(buf, buf_offset, pos, limit)
+            # Keep one character before `pos` for the digit lookbehind.
+            keep = max(pos - 1, 0)
+            buf, buf_offset, pos = buf[keep:], buf_offset + keep, pos - keep
+        yield from self._scan_buffer(buf, buf_offset, pos, len(buf))
+
+    def _scan_buffer(self, buf: str, buf_offset: int, pos: int, limit: int):
+        """Yields the tokens starting in buf[pos:limit]; returns where scanning should resume."""
+        half_N, search = self.encoder.half_N, self._pattern.search
+        while True:
+            match = search(buf, pos)
+            if match is None or match.start() >= limit:
+                return max(pos, limit)
+            indices, end = self._read_emojis(buf, match.end(), half_N)
+            data = None
+            if indices is not None:
+                value = self.encoder._decode_value(buf[match.start():match.start() + half_N], indices)
+                if value <= self.encoder.max_input_value:
+                    data = value.to_bytes(self.encoder.record_size, 'big', signed=False)
+            if data is None:
+                pos = match.start() + 1
+                continue
+            yield buf_offset + match.start(), buf_offset + end, data
+            pos = end
+
+    def _read_emojis(self, text: str, pos: int, count: int):
+        """
+        Reads exactly `count` alphabet emojis at text[pos:] by longest match
+        in the trie. Returns (indices, end), or (None, pos) if there are
+        fewer, or if another alphabet emoji follows.
+        """
+        root, indices, end = self.encoder._emoji_trie, [], len(text)
+        while True:
+            node, cursor, match = root, pos, None
+            while cursor < end:
+                node = node.get(text[cursor])
+                if node is None: break
+                cursor += 1
+                if _TRIE_END in node: match, matched_end = node[_TRIE_END], cursor
+            if len(indices) == count:
+                return (indices, pos) if match is None else (None, pos)
+            if match is None:
+                return None, pos
+            indices.append(match)
+            pos = matched_end
+
+    def scan_file(self, path: str, encoding: str = 'utf-8') -> Iterator[Tuple[int, int, bytes]]:
+        """scan() over a text file, read in chunks."""
+        with open(path, 'r', encoding=encoding, errors='replace') as f:
+            yield from self.scan(f)
+
+def _text_chunks(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Turns a str, text file or iterable of strings into chunks of about SCAN_CHUNK_CHARS."""
+    if isinstance(source, str):
+        yield source
+        return
+    if hasattr(source, 'read'):
+        yield from iter(lambda: source.read(SCAN_CHUNK_CHARS), "")
+        return
+    pending, size = [], 0
+    for piece in source:
+        pending.append(piece)
+        size += len(piece)
+        if size >= SCAN_CHUNK_CHARS:
+            yield "".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield "".join(pending)
+
+def scan_tokens(config: dict, source: Union[str, Iterable[str]], input_bits: Optional[int] = None,
+                separator: str = DEFAULT_SEPARATOR) -> Iterator[Tuple[int, int, bytes]]:
+    """Shorthand for TokenScanner(config, input_bits, separator).scan(source)."""
+    return TokenScanner(config, input_bits, separator).scan(source)
@@ -1,78 +1,204 @@
 #scraper.py
-import requests
+# Builds emoji_data.json from Unicode's emoji-test.txt, either by downloading
+# it (scrape_and_process_emojis) or by streaming local copies of it
+# (ingest_emoji_test_files) for machines without network access. Local files
+# are merged into the existing data incrementally: only the sets that gained
+# emojis are re-sorted, and the result is written atomically.
+#
+# A prebuilt snapshot of the per-version sets (emoji_snapshot.json) ships as
+# package data, so the API server can start without scraping at all;
+# write_emoji_snapshot regenerates it from local emoji-test.txt files.
 import json
 import os
 import re
 from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .fileutil import atomic_write
 
 # --- Configuration ---
 # Using Unicode 13.0 data as a reliable source covering the 2020 timeframe.
-EMOJI_DATA_URL = "https://unicode.org/Public/emoji/13.0/emoji-test.txt"
+DEFAULT_UNICODE_VERSION = "13.0"
+EMOJI_DATA_URL_TEMPLATE = "https://unicode.org/Public/emoji/{version}/emoji-test.txt"
+EMOJI_DATA_URL = EMOJI_DATA_URL_TEMPLATE.format(version=DEFAULT_UNICODE_VERSION)
 
 # --- Patched Section: Use the script's directory for the output file ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_FILENAME = "emoji_data.json"
 OUTPUT_FILE_PATH = os.path.join(SCRIPT_DIR, OUTPUT_FILENAME)
+SNAPSHOT_PATH = os.path.join(SCRIPT_DIR, "emoji_snapshot.json")
+SNAPSHOT_FORMAT = "doublebase-emoji-snapshot"
+SNAPSHOT_FORMAT_VERSION = 1
 
 # Define the versions for our sets
 CORE_VERSIONS = {'11.0'}
 EXTENDED_VERSIONS = {'11.0', '12.0', '12.1', '13.0'} # Covers 2018-2020 releases
 
-def scrape_and_process_emojis():
+# Derived sets and the versions they are built from.
+COMBINED_SETS = {'core': CORE_VERSIONS, 'extended': EXTENDED_VERSIONS}
+
+# This regex captures the emoji character and its version number from lines like:
+# 1F9A0 ; fully-qualified # 🦠 E11.0 microbe
+EMOJI_VERSION_PATTERN = re.compile(r'fully-qualified\s+#\s+(.*?)\s+E(\d+\.\d+)')
+
+def iter_emoji_versions(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Yields (emoji, version) for each fully-qualified entry in emoji-test.txt lines."""
+    for line in lines:
+        if line.startswith('#') or not line.strip():
+            continue # Skip comments and empty lines
+        match = EMOJI_VERSION_PATTERN.search(line)
+        if match:
+            yield match.group(1).strip(), match.group(2)
+
+def read_emoji_test_file(path: str) -> Dict[str, Set[str]]:
+    """Streams a local emoji-test.txt and returns {version: emojis}."""
+    emojis_by_version = defaultdict(set)
+    with open(path, 'r', encoding='utf-8') as f:
+        for emoji_char, version in iter_emoji_versions(f):
+            emojis_by_version[version].add(emoji_char)
+    return emojis_by_version
+
+def build_emoji_sets(emojis_by_version: Dict[str, Iterable[str]]) -> Dict[str, List[str]]:
+    """Builds the full emoji_data.json structure: one set per version plus the combined sets."""
+    all_sets = {f"v{v}": sorted(set(emojis)) for v, emojis in emojis_by_version.items()}
+    for name, versions in COMBINED_SETS.items():
+        combined = set()
+        for version in versions:
+            combined.update(all_sets.get(f"v{version}", []))
+        all_sets[name] = sorted(combined)
+    return all_sets
+
+def merge_emoji_sets(all_sets: Dict[str, List[str]], emojis_by_version: Dict[str, Iterable[str]]) -> Set[str]:
+    """
+    Adds newly seen emojis to `all_sets` in place, updating each version set
+    and the combined sets that include it. Only sets that actually gain
+    emojis are re-sorted. Returns the names of the sets that changed.
+    """
+    additions = defaultdict(set)
+    for version, emojis in emojis_by_version.items():
+        additions[f"v{version}"].update(emojis)
+        for name, versions in COMBINED_SETS.items():
+            if version in versions:
+                additions[name].update(emojis)
+    for name in COMBINED_SETS:
+        all_sets.setdefault(name, [])
+
+    changed = set()
+    for name, emojis in additions.items():
+        existing = all_sets.get(name, [])
+        new = emojis.difference(existing)
+        if new:
+            all_sets[name] = sorted(existing + list(new))
+            changed.add(name)
+    return changed
+
+def write_emoji_data(all_sets: Dict[str, List[str]], path: str = OUTPUT_FILE_PATH) -> None:
+    """Writes emoji_data.json atomically, so a server starting concurrently never reads half a file."""
+    with atomic_write(path, 'w', encoding='utf-8') as f:
+        json.dump(all_sets, f, ensure_ascii=False, indent=2)
+
+def version_key(version: str) -> Tuple[int, ...]:
+    """Sort key for Unicode emoji versions such as '12.1'."""
+    return tuple(int(part) for part in version.split('.'))
+
+def write_emoji_snapshot(emojis_by_version: Dict[str, Iterable[str]], unicode_version: str = DEFAULT_UNICODE_VERSION,
+                         path: str = SNAPSHOT_PATH) -> None:
+    """
+    Writes the compact bundled snapshot: the per-version sets up to and
+    including `unicode_version` (the combined sets are derived on load).
+    """
+    limit = version_key(unicode_version)
+    versions = {v: sorted(set(emojis)) for v, emojis in sorted(emojis_by_version.items(), key=lambda item: version_key(item[0]))
+                if version_key(v) <= limit}
+    document = {"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_FORMAT_VERSION,
+                "unicode_version": unicode_version, "versions": versions}
+    with atomic_write(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, separators=(',', ':'))
+
+def read_snapshot_version(path: str = SNAPSHOT_PATH) -> str:
+    """Returns the Unicode emoji version the snapshot was built for."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)["unicode_version"]
+
+def load_emoji_snapshot(path: str = SNAPSHOT_PATH) -> Tuple[str, Dict[str, List[str]]]:
+    """
+    Loads the bundled snapshot and returns (unicode_version, sets) with sets
+    in the emoji_data.json structure. Raises ValueError for an unknown format.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+    if document.get("format") != SNAPSHOT_FORMAT or document.get("version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"'{path}' is not a supported emoji snapshot.")
+    return document["unicode_version"], build_emoji_sets(document["versions"])
+
+def _print_summary(all_sets: Dict[str, List[str]]) -> None:
+    print(f"Core set contains {len(all_sets['core'])} emojis.")
+    print(f"Extended set contains {len(all_sets['extended'])} emojis.")
+
+def ingest_emoji_test_files(paths: List[str], output_path: str = OUTPUT_FILE_PATH) -> Optional[Set[str]]:
+    """
+    Offline mode: streams each local emoji-test.txt in `paths` and merges its
+    emojis into the data at `output_path` (created if missing). The file is
+    only rewritten if some set changed. Returns the changed set names, or
+    None if the existing data could not be read.
+    """
+    all_sets = {}
+    if os.path.exists(output_path):
+        try:
+            with open(output_path, 'r', encoding='utf-8') as f:
+                all_sets = json.load(f)
+        except (IOError, ValueError) as e:
+            print(f"Error reading existing data '{output_path}': {e}")
+            return None
+
+    changed = set()
+    for path in paths:
+        print(f"Reading emoji data from {path}...")
+        changed |= merge_emoji_sets(all_sets, read_emoji_test_file(path))
+
+    if not changed and os.path.exists(output_path):
+        print(f"'{output_path}' is already up to date.")
+        return changed
+    try:
+        write_emoji_data(all_sets, output_path)
+    except IOError as e:
+        print(f"Error writing to file: {e}")
+        return None
+    print(f"\nSuccessfully updated '{output_path}' ({len(changed)} set(s) changed).")
+    _print_summary(all_sets)
+    return changed
+
+def scrape_and_process_emojis(output_path: str = OUTPUT_FILE_PATH, unicode_version: str = DEFAULT_UNICODE_VERSION):
     """
     Scrapes emoji data, categorizes emojis by version, and saves them
     into structured sets in a JSON file.
     """
-    print(f"Fetching emoji data from {EMOJI_DATA_URL}...")
+    import requests
+    url = EMOJI_DATA_URL_TEMPLATE.format(version=unicode_version)
+    print(f"Fetching emoji data from {url}...")
+    emojis_by_version = defaultdict(set)
     try:
-        response = requests.get(EMOJI_DATA_URL)
-        response.raise_for_status() # Raise an exception for bad status codes
+        with requests.get(url, stream=True) as response:
+            response.raise_for_status() # Raise an exception for bad status codes
+            print("Processing data...")
+            lines = (line.decode('utf-8') for line in response.iter_lines())
+            for emoji_char, version in iter_emoji_versions(lines):
+                emojis_by_version[version].add(emoji_char)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching data: {e}")
         return
 
-    print("Processing data...")
-    # This regex captures the emoji character and its version number from lines like:
-    # 1F9A0 ; fully-qualified # 🦠 E11.0 microbe
-    emoji_version_pattern = re.compile(r'fully-qualified\s+#\s+(.*?)\s+E(\d+\.\d+)')
-    
-    emojis_by_version = defaultdict(list)
-
-    for line in response.text.splitlines():
-        if line.startswith('#') or not line.strip():
-            continue # Skip comments and empty lines
-        
-        match = emoji_version_pattern.search(line)
-        if match:
-            emoji_char = match.group(1).strip()
-            version = match.group(2)
-            emojis_by_version[version].append(emoji_char)
-
     # --- Build the final data structure ---
-    all_sets = {f"v{v}": sorted(list(set(emojis))) for v, emojis in emojis_by_version.items()}
-
-    # Create the 'core' set (Unicode 11.0)
-    core_set_emojis = []
-    for version in CORE_VERSIONS:
-        core_set_emojis.extend(all_sets.get(f"v{version}", []))
-    all_sets['core'] = sorted(list(set(core_set_emojis)))
-
-    # Create the 'extended' set (Unicode 11.0 - 13.0)
-    extended_set_emojis = []
-    for version in EXTENDED_VERSIONS:
-        extended_set_emojis.extend(all_sets.get(f"v{version}", []))
-    all_sets['extended'] = sorted(list(set(extended_set_emojis)))
+    all_sets = build_emoji_sets(emojis_by_version)
 
     # --- Save to file ---
     try:
-        with open(OUTPUT_FILE_PATH, 'w', encoding='utf-8') as f:
-            json.dump(all_sets, f, ensure_ascii=False, indent=2)
-        print(f"\nSuccessfully created '{OUTPUT_FILE_PATH}'")
-        print(f"Core set contains {len(all_sets['core'])} emojis.")
-        print(f"Extended set contains {len(all_sets['extended'])} emojis.")
+        write_emoji_data(all_sets, output_path)
+        print(f"\nSuccessfully created '{output_path}'")
+        _print_summary(all_sets)
     except IOError as e:
         print(f"Error writing to file: {e}")
 
 
 if __name__ == "__main__":
-    scrape_and_process_emojis()
\ No newline at end of file
+    scrape_and_process_emojis()